@@ -3,33 +3,72 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import importlib.util
+import os
+import shutil
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from urllib.parse import urlparse
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any
+from tempfile import TemporaryDirectory, mkstemp
+from typing import Any, AsyncIterator, Iterator, Literal
 
 import httpx
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from networkx.readwrite import json_graph
 
+from . import json_utils
 from .pipeline import build_graph_from_root
 
 
-app = FastAPI(title="CodeIntel Graph API")
+_process_pool: ProcessPoolExecutor | None = None
 
 
-def _extract_zip_bytes(zip_bytes: bytes, target_dir: Path) -> Path:
-    if not zip_bytes:
-        raise HTTPException(status_code=400, detail="Empty archive.")
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor()
+    return _process_pool
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    global _process_pool
+    # One keep-alive client for the GitHub API probe and archive downloads,
+    # created here so it is bound to the serving event loop.
+    # HTTP/2 needs the optional h2 package (httpx[http2]).
+    async with httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=60.0,
+        headers={"User-Agent": "codeintel-graph-api"},
+    ) as http_client:
+        app.state.http_client = http_client
+        try:
+            yield
+        finally:
+            if _process_pool is not None:
+                _process_pool.shutdown(cancel_futures=True)
+                _process_pool = None
+
+
+app = FastAPI(title="CodeIntel Graph API", lifespan=_lifespan)
 
-    archive_path = target_dir / "repo.zip"
-    archive_path.write_bytes(zip_bytes)
+# Archives with fewer members than this are extracted on the calling thread.
+PARALLEL_EXTRACT_MIN_MEMBERS = 64
+
+COPY_CHUNK_SIZE = 1 << 20
+
+
+def _extract_zip(archive_path: Path, target_dir: Path) -> Path:
+    if not archive_path.exists() or archive_path.stat().st_size == 0:
+        raise HTTPException(status_code=400, detail="Empty archive.")
 
     try:
-        with zipfile.ZipFile(archive_path) as archive:
-            archive.extractall(target_dir / "repo")
+        _extract_archive(archive_path, target_dir / "repo")
     except zipfile.BadZipFile as exc:
         raise HTTPException(status_code=400, detail="Invalid zip archive.") from exc
 
@@ -40,7 +79,42 @@ def _extract_zip_bytes(zip_bytes: bytes, target_dir: Path) -> Path:
     return extracted_root
 
 
-def _normalize_github_repo_url(repo_url: str) -> list[str]:
+def _extract_archive(archive_path: Path, dest: Path) -> None:
+    with zipfile.ZipFile(archive_path) as archive:
+        members = archive.infolist()
+        if len(members) < PARALLEL_EXTRACT_MIN_MEMBERS:
+            archive.extractall(dest)
+            return
+
+        # Create every directory up front so worker threads never race on makedirs.
+        names: list[str] = []
+        for member in members:
+            parts = [
+                part
+                for part in member.filename.replace("\\", "/").split("/")
+                if part not in {"", ".", ".."}
+            ]
+            if member.is_dir():
+                dest.joinpath(*parts).mkdir(parents=True, exist_ok=True)
+                continue
+            dest.joinpath(*parts[:-1]).mkdir(parents=True, exist_ok=True)
+            names.append(member.filename)
+
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    batches = [names[idx::workers] for idx in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() re-raises the first worker failure.
+        list(executor.map(lambda batch: _extract_members(archive_path, batch, dest), batches))
+
+
+def _extract_members(archive_path: Path, names: list[str], dest: Path) -> None:
+    # Each thread opens its own handle; a shared ZipFile serializes reads on one lock.
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in names:
+            archive.extract(name, dest)
+
+
+async def _normalize_github_repo_url(repo_url: str, client: httpx.AsyncClient) -> list[str]:
     parsed = urlparse(repo_url)
     if parsed.scheme not in {"http", "https"}:
         raise HTTPException(status_code=400, detail="repo_url must be http/https.")
@@ -73,7 +147,7 @@ def _normalize_github_repo_url(repo_url: str) -> list[str]:
     if branch:
         return [f"https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"]
 
-    default_branch = _resolve_github_default_branch(owner, repo)
+    default_branch = await _resolve_github_default_branch(owner, repo, client)
     if default_branch:
         return [f"https://github.com/{owner}/{repo}/archive/refs/heads/{default_branch}.zip"]
 
@@ -83,14 +157,13 @@ def _normalize_github_repo_url(repo_url: str) -> list[str]:
     ]
 
 
-def _resolve_github_default_branch(owner: str, repo: str) -> str | None:
+async def _resolve_github_default_branch(
+    owner: str, repo: str, client: httpx.AsyncClient
+) -> str | None:
     api_url = f"https://api.github.com/repos/{owner}/{repo}"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "codeintel-graph-api",
-    }
+    headers = {"Accept": "application/vnd.github+json"}
     try:
-        response = httpx.get(api_url, headers=headers, timeout=20.0)
+        response = await client.get(api_url, headers=headers, timeout=20.0)
     except httpx.RequestError:
         return None
     if response.status_code != 200:
@@ -105,16 +178,21 @@ def _resolve_github_default_branch(owner: str, repo: str) -> str | None:
     return None
 
 
-def _download_repo_zip(repo_url: str) -> bytes:
-    candidates = _normalize_github_repo_url(repo_url)
+async def _download_repo_zip(
+    repo_url: str, archive_path: Path, client: httpx.AsyncClient
+) -> None:
+    candidates = await _normalize_github_repo_url(repo_url, client)
     last_status = None
     for url in candidates:
         try:
-            response = httpx.get(url, timeout=60.0)
+            async with client.stream("GET", url) as response:
+                if response.status_code == 200:
+                    with archive_path.open("wb") as handle:
+                        async for chunk in response.aiter_bytes(COPY_CHUNK_SIZE):
+                            handle.write(chunk)
+                    return
         except httpx.RequestError as exc:
             raise HTTPException(status_code=502, detail=f"Failed to reach {url}.") from exc
-        if response.status_code == 200:
-            return response.content
         if response.status_code == 404:
             last_status = response.status_code
             continue
@@ -138,28 +216,95 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def _build_graph(root: Path, max_files: int | None) -> Any:
+    # Already running in a _process_pool worker, which supplies the
+    # parallelism; workers=1 keeps extract_files from nesting another pool.
+    return build_graph_from_root(root, output_path=None, max_files=max_files, workers=1)
+
+
+def _build_graph_payload(root: Path, max_files: int | None) -> bytes:
+    # Serialized in the worker so only bytes are pickled back to the server.
+    return json_utils.dumps(json_graph.node_link_data(_build_graph(root, max_files)))
+
+
+def _write_graph_ndjson(root: Path, max_files: int | None, out_path: str) -> None:
+    # Written in the worker so the graph never crosses back to the server.
+    graph = _build_graph(root, max_files)
+    with open(out_path, "wb") as handle:
+        handle.writelines(_iter_ndjson(graph))
+
+
+def _stream_file(path: str) -> Iterator[bytes]:
+    # Removes the file as soon as it is read (or the client goes away
+    # mid-stream); the response's background task covers bodies never started.
+    try:
+        with open(path, "rb") as handle:
+            while chunk := handle.read(COPY_CHUNK_SIZE):
+                yield chunk
+    finally:
+        _remove_file(path)
+
+
+def _remove_file(path: str) -> None:
+    Path(path).unlink(missing_ok=True)
+
+
+def _iter_ndjson(graph: Any) -> Iterator[bytes]:
+    yield json_utils.dumps({"type": "graph", "attrs": graph.graph}) + b"\n"
+    for node_id, attrs in graph.nodes(data=True):
+        yield json_utils.dumps({"type": "node", "id": node_id, "attrs": attrs}) + b"\n"
+    for source, target, attrs in graph.edges(data=True):
+        yield json_utils.dumps(
+            {"type": "edge", "source": source, "target": target, "attrs": attrs}
+        ) + b"\n"
+
+
 @app.post("/parse")
-def parse_repo(
+async def parse_repo(
+    request: Request,
     file: UploadFile | None = File(default=None),
     repo_url: str | None = Query(default=None),
     max_files: int | None = None,
-) -> JSONResponse:
+    output_format: Literal["json", "ndjson"] = Query(default="json", alias="format"),
+) -> Response:
     if file is None and not repo_url:
         raise HTTPException(
             status_code=400, detail="Provide either a zip file upload or repo_url."
         )
 
     with TemporaryDirectory() as temp_dir:
+        archive_path = Path(temp_dir) / "repo.zip"
         if repo_url:
-            zip_bytes = _download_repo_zip(repo_url)
+            await _download_repo_zip(repo_url, archive_path, request.app.state.http_client)
         else:
             if not file or not file.filename or not file.filename.lower().endswith(".zip"):
                 raise HTTPException(status_code=400, detail="Upload a .zip archive.")
-            zip_bytes = file.file.read()
-        root = _extract_zip_bytes(zip_bytes, Path(temp_dir))
-        graph = build_graph_from_root(root, output_path=None, max_files=max_files)
-        data = json_graph.node_link_data(graph)
-        return JSONResponse(content=data)
+            with archive_path.open("wb") as handle:
+                await asyncio.to_thread(shutil.copyfileobj, file.file, handle, COPY_CHUNK_SIZE)
+        root = await asyncio.to_thread(_extract_zip, archive_path, Path(temp_dir))
+        loop = asyncio.get_running_loop()
+        if output_format == "ndjson":
+            # One JSON object per line (graph attrs, then nodes, then edges).
+            # The worker writes them to a file outside temp_dir, which outlives
+            # this block; both the stream and the background task remove it.
+            fd, ndjson_path = mkstemp(suffix=".ndjson")
+            os.close(fd)
+            try:
+                await loop.run_in_executor(
+                    _get_process_pool(), _write_graph_ndjson, root, max_files, ndjson_path
+                )
+            except BaseException:
+                _remove_file(ndjson_path)
+                raise
+            return StreamingResponse(
+                _stream_file(ndjson_path),
+                media_type="application/x-ndjson",
+                background=BackgroundTask(_remove_file, ndjson_path),
+            )
+        payload = await loop.run_in_executor(
+            _get_process_pool(), _build_graph_payload, root, max_files
+        )
+        return Response(content=payload, media_type="application/json")
 
 
 def main() -> int:
@@ -2,36 +2,91 @@
 
 from __future__ import annotations
 
-import ast
-from typing import Iterable
-
-from .models import Call, ImportItem, Inheritance, Location, Symbol
+import sys
+from dataclasses import dataclass, field
 
+from tree_sitter import Query, QueryCursor
 
-ASSIGNMENT_TYPES = {"assignment", "augmented_assignment", "ann_assignment"}
-IMPORT_TYPES = {"import_statement", "import_from_statement"}
-ASSIGNMENT_OPERATORS = {
-    "=",
-    "+=",
-    "-=",
-    "*=",
-    "/=",
-    "%=",
-    "**=",
-    "//=",
-    "@=",
-    "&=",
-    "|=",
-    "^=",
-    ">>=",
-    "<<=",
-}
+from .models import Call, ImportItem, Inheritance, Location, Symbol
+from .ts_lang import load_python_language
+
+
+# Frozen, interned sets: membership checks against tree-sitter's type strings
+# can then short-circuit on identity before falling back to string compare.
+ASSIGNMENT_TYPES = frozenset(
+    sys.intern(name) for name in ("assignment", "augmented_assignment", "ann_assignment")
+)
+IMPORT_TYPES = frozenset(
+    sys.intern(name) for name in ("import_statement", "import_from_statement")
+)
+ASSIGNMENT_OPERATORS = frozenset(
+    sys.intern(operator)
+    for operator in (
+        "=",
+        "+=",
+        "-=",
+        "*=",
+        "/=",
+        "%=",
+        "**=",
+        "//=",
+        "@=",
+        "&=",
+        "|=",
+        "^=",
+        ">>=",
+        "<<=",
+    )
+)
+
+LITERAL_TYPES = frozenset(
+    sys.intern(name)
+    for name in ("string", "concatenated_string", "integer", "float", "comment")
+)
+
+_SYMBOL_QUERY: Query | None = None
+
+
+@dataclass(slots=True)
+class _ExtractState:
+    source_bytes: bytes
+    results: dict
+    # Kind and qualified name of each enclosing definition, innermost last.
+    scope: list[tuple[str, str]] = field(default_factory=list)
+    # End byte of the definition that opened each scope entry.
+    scope_ends: list[int] = field(default_factory=list)
+    # Qualnames of the enclosing functions and classes, so the innermost of
+    # each is an O(1) read instead of a scan over scope.
+    functions: list[str] = field(default_factory=list)
+    classes: list[str] = field(default_factory=list)
+    # Dotted names already built for a node, keyed by tree-sitter node id.
+    dotted_names: dict[int, str] = field(default_factory=dict)
+
+    def qualname(self, name: str) -> str:
+        if not self.scope:
+            return name
+        return f"{self.scope[-1][1]}.{name}"
+
+    def current_function(self) -> str | None:
+        return self.functions[-1] if self.functions else None
+
+    def current_class(self) -> str | None:
+        return self.classes[-1] if self.classes else None
+
+    def push(self, kind: str, qualname: str, end_byte: int) -> None:
+        self.scope.append((kind, qualname))
+        self.scope_ends.append(end_byte)
+        (self.functions if kind == "function" else self.classes).append(qualname)
+
+    def leave_before(self, start_byte: int) -> None:
+        """Pop every definition that ends at or before ``start_byte``."""
+        while self.scope_ends and self.scope_ends[-1] <= start_byte:
+            self.scope_ends.pop()
+            kind, _ = self.scope.pop()
+            (self.functions if kind == "function" else self.classes).pop()
 
 
 def extract_symbols(parsed, path: str | None = None) -> dict:
-    tree = parsed.tree
-    source_bytes = parsed.source_bytes
-
     results = {
         "path": path,
         "functions": [],
@@ -41,118 +96,126 @@ def extract_symbols(parsed, path: str | None = None) -> dict:
         "calls": [],
         "inherits": [],
     }
-
-    scope: list[tuple[str, str]] = []
-
-    def walk(node):
-        node_type = node.type
-
-        if node_type == "function_definition":
-            name_node = node.child_by_field_name("name")
-            if name_node is not None:
-                name = _node_text(name_node, source_bytes)
-                qualname = _qualname(scope, name)
-                results["functions"].append(
-                    Symbol(
-                        kind="function",
-                        name=name,
-                        qualname=qualname,
-                        location=_location(name_node),
-                    )
-                )
-                scope.append(("function", name))
-                for child in node.children:
-                    walk(child)
-                scope.pop()
-                return
-
-        if node_type == "class_definition":
-            name_node = node.child_by_field_name("name")
-            if name_node is not None:
-                name = _node_text(name_node, source_bytes)
-                qualname = _qualname(scope, name)
-                results["classes"].append(
-                    Symbol(
-                        kind="class",
-                        name=name,
-                        qualname=qualname,
-                        location=_location(name_node),
-                    )
-                )
-                bases = _class_bases(node, source_bytes)
-                if bases:
-                    results["inherits"].append(
-                        Inheritance(
-                            class_name=qualname,
-                            bases=tuple(bases),
-                            location=_location(node),
-                        )
-                    )
-                scope.append(("class", name))
-                for child in node.children:
-                    walk(child)
-                scope.pop()
-                return
-
-        if node_type in ASSIGNMENT_TYPES:
-            for target in _assignment_targets(node, source_bytes):
-                results["variables"].append(
-                    Symbol(
-                        kind="variable",
-                        name=target,
-                        qualname=_qualname(scope, target),
-                        location=_location(node),
-                    )
-                )
-
-        if node_type in IMPORT_TYPES:
-            results["imports"].extend(_extract_imports(node, source_bytes))
-
-        if node_type == "call":
-            func_node = node.child_by_field_name("function") or node.child(0)
-            if func_node is not None:
-                name = _node_to_dotted_name(func_node, source_bytes)
-                caller = _current_function(scope)
-                class_scope = _current_class(scope)
-                if name and name.startswith("self.") and class_scope:
-                    _, method = name.split(".", 1)
-                    name = f"{class_scope}.{method}"
-                if name:
-                    results["calls"].append(
-                        Call(name=name, caller=caller, location=_location(node))
-                    )
-
-        for child in node.children:
-            walk(child)
-
-    walk(tree.root_node)
+    state = _ExtractState(source_bytes=parsed.source_bytes, results=results)
+
+    # The query engine finds every node of interest in one C-level pass; only
+    # scope bookkeeping and symbol construction happen in Python. Sorting by
+    # (start, -end) restores pre-order so parents precede their children.
+    # Capture names are the node types, so the handler is picked once per
+    # capture list instead of reading node.type for every node.
+    captures = QueryCursor(_symbol_query()).captures(parsed.tree.root_node)
+    targets = [
+        (node, _HANDLERS[capture_name])
+        for capture_name, captured in captures.items()
+        for node in captured
+    ]
+    targets.sort(key=lambda target: (target[0].start_byte, -target[0].end_byte))
+
+    for node, handler in targets:
+        state.leave_before(node.start_byte)
+        entry = handler(node, state)
+        if entry is not None:
+            state.push(*entry, node.end_byte)
 
     return results
 
 
-def _qualname(scope: Iterable[tuple[str, str]], name: str) -> str:
-    names = [value for _, value in scope]
-    if not names:
-        return name
-    return ".".join([*names, name])
-
-
-def _current_function(scope: list[tuple[str, str]]) -> str | None:
-    for idx in range(len(scope) - 1, -1, -1):
-        kind, _ = scope[idx]
-        if kind == "function":
-            names = [value for _, value in scope[: idx + 1]]
-            return ".".join(names)
-    return None
-
-
-def _current_class(scope: list[tuple[str, str]]) -> str | None:
-    for idx in range(len(scope) - 1, -1, -1):
-        kind, _ = scope[idx]
-        if kind == "class":
-            names = [value for _, value in scope[: idx + 1]]
-            return ".".join(names)
-    return None
+def _symbol_query() -> Query:
+    global _SYMBOL_QUERY
+    if _SYMBOL_QUERY is None:
+        language = load_python_language()
+        # Skip names the installed grammar doesn't define (e.g. ann_assignment).
+        patterns = [
+            f"({node_type}) @{node_type}"
+            for node_type in sorted(_HANDLERS)
+            if language.id_for_node_kind(node_type, True) is not None
+        ]
+        _SYMBOL_QUERY = Query(language, "\n".join(patterns))
+    return _SYMBOL_QUERY
+
+
+def _handle_function(node, state: _ExtractState) -> tuple[str, str] | None:
+    name_node = node.child_by_field_name("name")
+    if name_node is None:
+        return None
+    name = _node_text(name_node, state.source_bytes)
+    qualname = state.qualname(name)
+    state.results["functions"].append(
+        Symbol(
+            kind="function",
+            name=name,
+            qualname=qualname,
+            location=_location(name_node),
+        )
+    )
+    return ("function", qualname)
+
+
+def _handle_class(node, state: _ExtractState) -> tuple[str, str] | None:
+    name_node = node.child_by_field_name("name")
+    if name_node is None:
+        return None
+    name = _node_text(name_node, state.source_bytes)
+    qualname = state.qualname(name)
+    state.results["classes"].append(
+        Symbol(
+            kind="class",
+            name=name,
+            qualname=qualname,
+            location=_location(name_node),
+        )
+    )
+    bases = _class_bases(node, state.source_bytes, state.dotted_names)
+    if bases:
+        state.results["inherits"].append(
+            Inheritance(
+                class_name=qualname,
+                bases=tuple(bases),
+                location=_location(node),
+            )
+        )
+    return ("class", qualname)
+
+
+def _handle_assignment(node, state: _ExtractState) -> None:
+    for target in _assignment_targets(node, state.source_bytes, state.dotted_names):
+        state.results["variables"].append(
+            Symbol(
+                kind="variable",
+                name=target,
+                qualname=state.qualname(target),
+                location=_location(node),
+            )
+        )
+
+
+def _handle_import(node, state: _ExtractState) -> None:
+    state.results["imports"].extend(_extract_imports(node, state.source_bytes))
+
+
+def _handle_call(node, state: _ExtractState) -> None:
+    func_node = node.child_by_field_name("function") or node.child(0)
+    if func_node is None:
+        return
+    name = _node_to_dotted_name(func_node, state.source_bytes, state.dotted_names)
+    caller = state.current_function()
+    class_scope = state.current_class()
+    if name and name.startswith("self.") and class_scope:
+        _, method = name.split(".", 1)
+        name = f"{class_scope}.{method}"
+    if name:
+        state.results["calls"].append(
+            Call(name=name, caller=caller, location=_location(node))
+        )
+
+
+_HANDLERS = {
+    "function_definition": _handle_function,
+    "class_definition": _handle_class,
+    "call": _handle_call,
+    **{node_type: _handle_assignment for node_type in ASSIGNMENT_TYPES},
+    **{node_type: _handle_import for node_type in IMPORT_TYPES},
+}
 
 
 def _location(node) -> Location:
@@ -161,92 +224,157 @@ def _location(node) -> Location:
 
 
 def _node_text(node, source_bytes: bytes) -> str:
-    return source_bytes[node.start_byte : node.end_byte].decode("utf-8")
-
-
-def _node_to_dotted_name(node, source_bytes: bytes) -> str:
-    if node.type == "identifier":
-        return _node_text(node, source_bytes)
-    if node.type == "dotted_name":
-        return _node_text(node, source_bytes)
-    if node.type == "attribute":
+    return _decode(source_bytes[node.start_byte : node.end_byte])
+
+
+def _decode(raw: bytes) -> str:
+    # Identifiers are almost always ASCII; the ascii codec skips UTF-8 validation.
+    if raw.isascii():
+        return raw.decode("ascii")
+    return raw.decode("utf-8")
+
+
+def _node_to_dotted_name(
+    node, source_bytes: bytes, cache: dict[int, str] | None = None
+) -> str:
+    if cache is not None:
+        hit = cache.get(node.id)
+        if hit is not None:
+            return hit
+    name = _build_dotted_name(node, source_bytes)
+    if cache is not None:
+        cache[node.id] = name
+    return name
+
+
+def _build_dotted_name(node, source_bytes: bytes) -> str:
+    # Walk down the attribute chain once, collecting the attribute nodes, then
+    # join the byte slices outward from the base and decode a single time.
+    chain = []
+    while node.type == "attribute":
         obj = node.child_by_field_name("object") or node.child(0)
         attr = node.child_by_field_name("attribute") or node.child(node.child_count - 1)
         if obj is None or attr is None:
-            return _node_text(node, source_bytes)
-        obj_name = _node_to_dotted_name(obj, source_bytes)
-        attr_name = _node_to_dotted_name(attr, source_bytes)
-        if obj_name and attr_name:
-            return f"{obj_name}.{attr_name}"
-    return _node_text(node, source_bytes)
-
-
-def _collect_identifiers(node, source_bytes: bytes) -> list[str]:
+            break
+        chain.append((node, attr))
+        node = obj
+
+    parts = [source_bytes[node.start_byte : node.end_byte]]
+    for attribute, attr in reversed(chain):
+        attr_bytes = source_bytes[attr.start_byte : attr.end_byte]
+        if parts[-1] and attr_bytes:
+            parts.append(attr_bytes)
+        else:
+            # An empty segment (error recovery) falls back to the raw text.
+            parts = [source_bytes[attribute.start_byte : attribute.end_byte]]
+    return _decode(b".".join(parts))
+
+
+def _collect_identifiers(
+    node, source_bytes: bytes, cache: dict[int, str] | None = None
+) -> list[str]:
     names: list[str] = []
 
-    if node.type == "identifier":
+    node_type = node.type
+    if node_type == "identifier":
         return [_node_text(node, source_bytes)]
-    if node.type == "attribute":
-        return [_node_to_dotted_name(node, source_bytes)]
+    if node_type == "attribute":
+        return [_node_to_dotted_name(node, source_bytes, cache)]
+    # Leaves other than identifiers, and literal subtrees (docstrings can be
+    # large), hold no names worth recording.
+    if node.child_count == 0 or node_type in LITERAL_TYPES:
+        return names
 
     for child in node.children:
-        names.extend(_collect_identifiers(child, source_bytes))
+        names.extend(_collect_identifiers(child, source_bytes, cache))
 
     return names
 
 
-def _assignment_targets(node, source_bytes: bytes) -> list[str]:
-    for field in ("left", "target", "targets", "name"):
-        child = node.child_by_field_name(field)
+def _assignment_targets(
+    node, source_bytes: bytes, cache: dict[int, str] | None = None
+) -> list[str]:
+    for field_name in ("left", "target", "targets", "name"):
+        child = node.child_by_field_name(field_name)
         if child is not None:
-            return _collect_identifiers(child, source_bytes)
+            return _collect_identifiers(child, source_bytes, cache)
 
     names: list[str] = []
     for child in node.children:
         if child.type in ASSIGNMENT_OPERATORS:
             break
-        names.extend(_collect_identifiers(child, source_bytes))
+        names.extend(_collect_identifiers(child, source_bytes, cache))
 
     return names
 
 
-def _class_bases(node, source_bytes: bytes) -> list[str]:
-    for field in ("superclasses", "superclass"):
-        bases_node = node.child_by_field_name(field)
+def _class_bases(
+    node, source_bytes: bytes, cache: dict[int, str] | None = None
+) -> list[str]:
+    for field_name in ("superclasses", "superclass"):
+        bases_node = node.child_by_field_name(field_name)
         if bases_node is not None:
-            return _collect_identifiers(bases_node, source_bytes)
+            return _collect_identifiers(bases_node, source_bytes, cache)
 
     return []
 
 
 def _extract_imports(node, source_bytes: bytes) -> list[ImportItem]:
-    text = _node_text(node, source_bytes)
-    try:
-        module = ast.parse(text)
-    except SyntaxError:
+    # Mirrors what ast.Import/ast.ImportFrom would report; statements with
+    # syntax errors are skipped, as a failed ast.parse used to skip them.
+    if node.has_error:
         return []
 
-    imports: list[ImportItem] = []
-    for stmt in module.body:
-        if isinstance(stmt, ast.Import):
-            names = tuple(alias.name for alias in stmt.names)
-            imports.append(
-                ImportItem(
-                    kind="import",
-                    module=None,
-                    names=names,
-                    location=_location(node),
-                )
+    if node.type == "import_statement":
+        return [
+            ImportItem(
+                kind="import",
+                module=None,
+                names=tuple(_imported_names(node, source_bytes)),
+                location=_location(node),
             )
-        elif isinstance(stmt, ast.ImportFrom):
-            names = tuple(alias.name for alias in stmt.names)
-            imports.append(
-                ImportItem(
-                    kind="from",
-                    module=stmt.module,
-                    names=names,
-                    location=_location(node),
-                )
+        ]
+
+    module = None
+    module_node = node.child_by_field_name("module_name")
+    if module_node is not None:
+        if module_node.type == "relative_import":
+            # ast drops the leading dots and keeps only the dotted tail, if any.
+            module_node = next(
+                (child for child in module_node.named_children if child.type == "dotted_name"),
+                None,
             )
+        if module_node is not None:
+            module = _dotted_text(module_node, source_bytes)
+
+    names = _imported_names(node, source_bytes)
+    if any(child.type == "wildcard_import" for child in node.named_children):
+        names.append("*")
+
+    return [
+        ImportItem(
+            kind="from",
+            module=module,
+            names=tuple(names),
+            location=_location(node),
+        )
+    ]
+
+
+def _imported_names(node, source_bytes: bytes) -> list[str]:
+    names: list[str] = []
+    for child in node.children_by_field_name("name"):
+        if child.type == "aliased_import":
+            child = child.child_by_field_name("name")
+            if child is None:
+                continue
+        names.append(_dotted_text(child, source_bytes))
+    return names
+
 
-    return imports
+def _dotted_text(node, source_bytes: bytes) -> str:
+    return ".".join(
+        _node_text(child, source_bytes)
+        for child in node.named_children
+        if child.type == "identifier"
+    )
@@ -2,21 +2,35 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Iterable
 
 
-DEFAULT_EXCLUDES = {".venv", "__pycache__", ".git", ".hg", ".svn"}
+DEFAULT_EXCLUDES = frozenset({".venv", "__pycache__", ".git", ".hg", ".svn"})
 
 
 def iter_python_files(root: str | Path, excludes: Iterable[str] | None = None) -> list[str]:
-    root_path = Path(root)
-    exclude_set = set(excludes or DEFAULT_EXCLUDES)
+    # frozenset() of a frozenset returns it unchanged, so the default costs nothing.
+    exclude_set = frozenset(excludes or DEFAULT_EXCLUDES)
     matches: list[str] = []
 
-    for path in root_path.rglob("*.py"):
-        if any(part in exclude_set for part in path.parts):
+    # Pre-order walk (a directory's files before its subdirectories); excluded
+    # directories are dropped at the DirEntry level so their subtrees are never read.
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        subdirs: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in exclude_set:
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        matches.append(entry.path)
+        except OSError:
             continue
-        matches.append(str(path))
+        stack.extend(reversed(subdirs))
 
-    return matches
\ No newline at end of file
+    return matches
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import sys
+from array import array
 from dataclasses import dataclass
 from typing import Iterable
 
@@ -18,8 +20,13 @@ EDGE_CALLS = "CALLS"
 EDGE_IMPORTS = "IMPORTS"
 EDGE_INHERITS = "INHERITS"
 
+NODE_TYPES = (NODE_FILE, NODE_FUNCTION, NODE_CLASS)
+EDGE_TYPES = (EDGE_CALLS, EDGE_IMPORTS, EDGE_INHERITS)
+_NODE_TYPE_CODES = {name: code for code, name in enumerate(NODE_TYPES)}
+_EDGE_TYPE_CODES = {name: code for code, name in enumerate(EDGE_TYPES)}
 
-@dataclass
+
+@dataclass(slots=True)
 class ExtractedFile:
     path: str
     functions: list[Symbol]
@@ -50,29 +57,100 @@ def class_node_id(path: str | None, qualname: str) -> str:
     return f"class:external:{qualname}"
 
 
+class CompactGraph:
+    """Struct-of-arrays graph used while building.
+
+    Node ids map to row numbers; node and edge types are stored as small integer
+    codes. Repeated edges between the same pair keep one row, matching DiGraph.
+    """
+
+    def __init__(self) -> None:
+        self.node_ids: list[str] = []
+        self.node_types = array("B")
+        self.node_attrs: list[dict] = []
+        self.edge_sources = array("i")
+        self.edge_targets = array("i")
+        self.edge_types = array("B")
+        self._node_index: dict[str, int] = {}
+        self._edge_index: dict[tuple[int, int], int] = {}
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._node_index
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.edge_types)
+
+    def add_node(self, node_id: str, node_type: str, **attrs) -> int:
+        """Add a node unless it already exists; return its row."""
+        row = self._node_index.get(node_id)
+        if row is None:
+            row = len(self.node_ids)
+            self._node_index[node_id] = row
+            self.node_ids.append(node_id)
+            self.node_types.append(_NODE_TYPE_CODES[node_type])
+            self.node_attrs.append(attrs)
+        return row
+
+    def add_edge(self, source_id: str, target_id: str, edge_type: str) -> None:
+        key = (self._node_index[source_id], self._node_index[target_id])
+        code = _EDGE_TYPE_CODES[edge_type]
+        row = self._edge_index.get(key)
+        if row is not None:
+            self.edge_types[row] = code
+            return
+        self._edge_index[key] = len(self.edge_types)
+        self.edge_sources.append(key[0])
+        self.edge_targets.append(key[1])
+        self.edge_types.append(code)
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        node_ids = self.node_ids
+        graph.add_nodes_from(
+            (node_id, {"type": NODE_TYPES[code], **attrs})
+            for node_id, code, attrs in zip(node_ids, self.node_types, self.node_attrs)
+        )
+        graph.add_edges_from(
+            (node_ids[source], node_ids[target], {"type": EDGE_TYPES[code]})
+            for source, target, code in zip(
+                self.edge_sources, self.edge_targets, self.edge_types
+            )
+        )
+        return graph
+
+
 def build_graph(extracted: Iterable[dict]) -> nx.DiGraph:
-    graph = nx.DiGraph()
+    return build_compact_graph(extracted).to_networkx()
+
+
+def build_compact_graph(extracted: Iterable[dict]) -> CompactGraph:
+    graph = CompactGraph()
     index = _DefinitionIndex()
+    # Inheritance and call edges need every definition indexed first, so they
+    # are collected here and resolved once the single pass over entries is done.
+    pending_inherits: list[tuple[str, Inheritance]] = []
+    pending_calls: list[tuple[str, Call]] = []
 
     for entry in extracted:
         path = entry["path"]
         if not path:
             continue
         file_id = file_node_id(path)
-        _ensure_node(
-            graph,
+        graph.add_node(
             file_id,
-            type=NODE_FILE,
+            NODE_FILE,
             name=path,
             path=path,
         )
 
         for symbol in entry["functions"]:
             node_id = function_node_id(path, symbol.qualname)
-            _ensure_node(
-                graph,
+            graph.add_node(
                 node_id,
-                type=NODE_FUNCTION,
+                NODE_FUNCTION,
                 name=symbol.name,
                 qualname=symbol.qualname,
                 path=path,
@@ -81,66 +159,64 @@ def build_graph(extracted: Iterable[dict]) -> nx.DiGraph:
 
         for symbol in entry["classes"]:
             node_id = class_node_id(path, symbol.qualname)
-            _ensure_node(
-                graph,
+            graph.add_node(
                 node_id,
-                type=NODE_CLASS,
+                NODE_CLASS,
                 name=symbol.name,
                 qualname=symbol.qualname,
                 path=path,
             )
             index.add_class(path, symbol, node_id)
 
-    for entry in extracted:
-        path = entry["path"]
-        if not path:
-            continue
-        file_id = file_node_id(path)
+        for inherit in entry.get("inherits", []):
+            index.add_bases(path, inherit)
+            pending_inherits.append((path, inherit))
 
+        # Import edges only touch module nodes, so they don't wait for the index.
         for imp in entry["imports"]:
             _add_import_edges(graph, file_id, imp)
 
-        for inherit in entry.get("inherits", []):
-            sub_id = index.resolve_class(path, inherit.class_name)
-            if sub_id is None:
-                continue
-            for base in inherit.bases:
-                base_id = index.resolve_class(path, base)
-                if base_id is None:
-                    base_id = class_node_id(None, base)
-                    _ensure_node(
-                        graph,
-                        base_id,
-                        type=NODE_CLASS,
-                        name=base,
-                        qualname=base,
-                        path=None,
-                        external=True,
-                    )
-                graph.add_edge(sub_id, base_id, type=EDGE_INHERITS)
-
-        for call in entry["calls"]:
-            caller_id = index.resolve_function(path, call.caller)
-            if caller_id is None:
-                continue
-            target_id = index.resolve_function(path, call.name)
-            if target_id is None:
-                target_id = function_node_id(None, call.name)
-                _ensure_node(
-                    graph,
-                    target_id,
-                    type=NODE_FUNCTION,
-                    name=call.name.split(".")[-1],
-                    qualname=call.name,
+        pending_calls.extend((path, call) for call in entry["calls"])
+
+    for path, inherit in pending_inherits:
+        sub_id = index.resolve_class(path, inherit.class_name)
+        if sub_id is None:
+            continue
+        for base in inherit.bases:
+            base_id = index.resolve_class(path, base)
+            if base_id is None:
+                base_id = class_node_id(None, base)
+                graph.add_node(
+                    base_id,
+                    NODE_CLASS,
+                    name=base,
+                    qualname=base,
                     path=None,
                     external=True,
                 )
-            graph.add_edge(caller_id, target_id, type=EDGE_CALLS)
+            graph.add_edge(sub_id, base_id, EDGE_INHERITS)
+
+    for path, call in pending_calls:
+        caller_id = index.resolve_function(path, call.caller)
+        if caller_id is None:
+            continue
+        target_id = index.resolve_function(path, call.name)
+        if target_id is None:
+            target_id = function_node_id(None, call.name)
+            graph.add_node(
+                target_id,
+                NODE_FUNCTION,
+                name=call.name.split(".")[-1],
+                qualname=call.name,
+                path=None,
+                external=True,
+            )
+        graph.add_edge(caller_id, target_id, EDGE_CALLS)
 
     return graph
 
 
-def _add_import_edges(graph: nx.DiGraph, file_id: str, item: ImportItem) -> None:
+def _add_import_edges(graph: CompactGraph, file_id: str, item: ImportItem) -> None:
     targets: list[str] = []
     if item.kind == "import":
         targets.extend(item.names)
@@ -150,20 +226,14 @@ def _add_import_edges(graph: nx.DiGraph, file_id: str, item: ImportItem) -> None
 
     for target in targets:
         module_id = module_node_id(target)
-        _ensure_node(
-            graph,
+        graph.add_node(
             module_id,
-            type=NODE_FILE,
+            NODE_FILE,
             name=target,
             path=None,
             external=True,
         )
-        graph.add_edge(file_id, module_id, type=EDGE_IMPORTS)
-
-
-def _ensure_node(graph: nx.DiGraph, node_id: str, **attrs) -> None:
-    if node_id not in graph:
-        graph.add_node(node_id, **attrs)
+        graph.add_edge(file_id, module_id, EDGE_IMPORTS)
 
 
 class _DefinitionIndex:
@@ -175,44 +245,76 @@ class _DefinitionIndex:
         self._class_by_path_qual: dict[tuple[str, str], str] = {}
         self._class_by_qual: dict[str, list[str]] = {}
         self._class_by_name: dict[str, list[str]] = {}
+        self._class_location: dict[str, tuple[str, str]] = {}
+        self._class_bases: dict[str, tuple[str, tuple[str, ...]]] = {}
 
     def add_function(self, path: str, symbol: Symbol, node_id: str) -> None:
+        name = sys.intern(symbol.name)
         self._func_by_path_qual[(path, symbol.qualname)] = node_id
-        self._func_by_path_name[(path, symbol.name)] = node_id
+        self._func_by_path_name[(path, name)] = node_id
         self._func_by_qual.setdefault(symbol.qualname, []).append(node_id)
-        self._func_by_name.setdefault(symbol.name, []).append(node_id)
+        self._func_by_name.setdefault(name, []).append(node_id)
 
     def add_class(self, path: str, symbol: Symbol, node_id: str) -> None:
         self._class_by_path_qual[(path, symbol.qualname)] = node_id
         self._class_by_qual.setdefault(symbol.qualname, []).append(node_id)
-        self._class_by_name.setdefault(symbol.name, []).append(node_id)
+        self._class_by_name.setdefault(sys.intern(symbol.name), []).append(node_id)
+        self._class_location[node_id] = (path, symbol.qualname)
+
+    def add_bases(self, path: str, inherit: Inheritance) -> None:
+        class_id = self._class_by_path_qual.get((path, inherit.class_name))
+        if class_id is not None:
+            self._class_bases[class_id] = (path, inherit.bases)
 
     def resolve_function(self, path: str, name: str | None) -> str | None:
         if not name:
             return None
-        if "." in name:
-            if (path, name) in self._func_by_path_qual:
-                return self._func_by_path_qual[(path, name)]
-            return self._first(self._func_by_qual.get(name))
-
-        if (path, name) in self._func_by_path_name:
-            return self._func_by_path_name[(path, name)]
+        owner, _, tail = name.rpartition(".")
+        if owner:
+            node_id = self._func_by_path_qual.get((path, name))
+            if node_id is not None:
+                return node_id
+            node_id = self._first(self._func_by_qual.get(name))
+            if node_id is not None:
+                return node_id
+            return self._resolve_inherited(path, owner, tail)
+
+        node_id = self._func_by_path_name.get((path, name))
+        if node_id is not None:
+            return node_id
         return self._first(self._func_by_name.get(name))
 
     def resolve_class(self, path: str, name: str | None) -> str | None:
         if not name:
             return None
+        node_id = self._class_by_path_qual.get((path, name))
+        if node_id is not None:
+            return node_id
         if "." in name:
-            if (path, name) in self._class_by_path_qual:
-                return self._class_by_path_qual[(path, name)]
             return self._first(self._class_by_qual.get(name))
-
-        if (path, name) in self._class_by_path_qual:
-            return self._class_by_path_qual[(path, name)]
         return self._first(self._class_by_name.get(name))
 
+    def _resolve_inherited(self, path: str, owner: str, method: str) -> str | None:
+        # `Class.method` defined on a base class, e.g. a self-call rewritten
+        # to the subclass name. Walks the known bases breadth-first.
+        pending = [(path, owner)]
+        seen: set[str] = set()
+        while pending:
+            class_path, class_name = pending.pop(0)
+            class_id = self.resolve_class(class_path, class_name)
+            if class_id is None or class_id in seen:
+                continue
+            seen.add(class_id)
+            def_path, qualname = self._class_location[class_id]
+            node_id = self._func_by_path_qual.get((def_path, f"{qualname}.{method}"))
+            if node_id is not None:
+                return node_id
+            bases_path, bases = self._class_bases.get(class_id, (def_path, ()))
+            pending.extend((bases_path, base) for base in bases)
+        return None
+
     @staticmethod
     def _first(values: list[str] | None) -> str | None:
         if not values:
             return None
-        return values[0]
\ No newline at end of file
+        return values[0]
@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Callable
+import re
+from typing import Any, Callable, Iterator
 
+from . import json_utils
 from .openrouter_client import OpenRouterConfig, OpenRouterRequestError
 
 
+def text_part(text: str, cacheable: bool = False) -> dict[str, Any]:
+    """Message content part; ``cacheable`` marks a static prompt prefix.
+
+    Providers that support prompt caching (Anthropic, Gemini via OpenRouter)
+    reuse everything up to a ``cache_control`` breakpoint across requests;
+    others ignore the marker.
+    """
+    part: dict[str, Any] = {"type": "text", "text": text}
+    if cacheable:
+        part["cache_control"] = {"type": "ephemeral"}
+    return part
+
+
 def extract_content(response: dict[str, Any] | None) -> str | None:
     if not response or not isinstance(response, dict):
         return None
@@ -24,16 +38,19 @@ def extract_content(response: dict[str, Any] | None) -> str | None:
     return content if isinstance(content, str) else None
 
 
-def parse_json_content(content: str) -> tuple[dict[str, Any] | None, str | None]:
+def parse_json_content(content: str | bytes) -> tuple[dict[str, Any] | None, str | None]:
     try:
-        return json.loads(content), None
-    except json.JSONDecodeError as exc:
-        candidate = _extract_json_candidate(content)
-        if candidate:
+        return json_utils.loads(content), None
+    except json_utils.JSONDecodeError as exc:
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", errors="replace")
+        # Prose like "use {name}" can precede the real object, so try each
+        # balanced block before giving up (and paying for an LLM repair).
+        for candidate in _json_candidates(content):
             try:
-                return json.loads(candidate), None
-            except json.JSONDecodeError as exc2:
-                return None, f"Failed to parse JSON: {exc2}"
+                return json_utils.loads(candidate), None
+            except json_utils.JSONDecodeError as candidate_exc:
+                exc = candidate_exc
         return None, f"Failed to parse JSON: {exc}"
 
 
@@ -61,9 +78,37 @@ def repair_json_content(
     return extract_content(response)
 
 
+# Backslash escapes (consumed as a pair), quotes and braces; everything else
+# is skipped by the regex engine.
+_JSON_TOKEN_RE = re.compile(r'\\.|[{}"]', re.DOTALL)
+
+
 def _extract_json_candidate(content: str) -> str | None:
-    start = content.find("{")
-    end = content.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        return None
-    return content[start : end + 1]
\ No newline at end of file
+    """Return the first balanced ``{...}`` block, ignoring braces inside strings."""
+    return next(_json_candidates(content), None)
+
+
+def _json_candidates(content: str) -> Iterator[str]:
+    """Yield each top-level balanced ``{...}`` block in order."""
+    depth = 0
+    start = -1
+    in_string = False
+    for match in _JSON_TOKEN_RE.finditer(content):
+        token = match.group()
+        if token[0] == "\\":
+            continue
+        if token == '"':
+            # Quotes in prose around the object don't open strings.
+            if depth:
+                in_string = not in_string
+            continue
+        if in_string:
+            continue
+        if token == "{":
+            if depth == 0:
+                start = match.start()
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                yield content[start : match.end()]
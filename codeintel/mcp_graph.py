@@ -2,18 +2,30 @@
 
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from itertools import chain
+from typing import Iterable, Iterator, Sequence
 
 import networkx as nx
 
 
 DEFAULT_EDGE_TYPES = {"CALLS", "IMPORTS", "INHERITS"}
+SEARCH_GRAM_SIZE = 3
+HAYSTACK_SEPARATOR = "\0"
 
+# (source index, target index, edge type)
+_Edge = tuple[int, int, str]
+# Neighbour index lists plus the matching edge lists, per node index.
+_Adjacency = tuple[list[list[int]], list[list[_Edge]]]
+# (neighbour index, edge) recorded for a node reached during a path search.
+_Hop = tuple[int, _Edge]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class GraphSnapshot:
     source_root: str | None
     generated_at: str | None
@@ -26,14 +38,47 @@ class GraphService:
     def __init__(self, graph: nx.DiGraph, graph_json_path: str | None = None) -> None:
         self.graph = graph
         self.graph_json_path = graph_json_path
-        self._nodes = []
-        self._node_by_id: dict[str, dict] = {}
+        # Node attributes as parallel columns indexed like _idx_to_id.
+        self._node_type: list[str | None] = []
+        self._node_name: list[str | None] = []
+        self._node_qualname: list[str | None] = []
+        self._node_path: list[str | None] = []
+        self._node_external = bytearray()
         self._exact_index: dict[str, dict[str, list[str]]] = {
             "id": {},
             "name": {},
             "qualname": {},
             "path": {},
         }
+        # Lower-cased value -> ids from the highest-priority _exact_index key
+        # (id, qualname, name, path) that contains it.
+        self._seed_index: dict[str, list[str]] = {}
+        # Integer-indexed adjacency for traversals: node i's neighbours are
+        # _succ[i] / _pred[i]. _succ_edges[i] / _pred_edges[i] hold the
+        # matching (source, target, type) edges at the same positions; each
+        # edge tuple is shared by its source's and its target's rows.
+        self._id_to_idx: dict[str, int] = {}
+        self._idx_to_id: list[str] = []
+        self._succ: list[list[int]] = []
+        self._pred: list[list[int]] = []
+        self._succ_edges: list[list[_Edge]] = []
+        self._pred_edges: list[list[_Edge]] = []
+        # The same rows restricted to a set of edge types, built on demand.
+        self._filtered_rows: dict[tuple[bool, frozenset[str]], _Adjacency] = {}
+        self._node_counts: dict[str, int] = {}
+        self._edge_counts: dict[str, int] = {}
+        self._module_counts: dict[str, int] = {}
+        self._module_breakdown: list[tuple[str, int]] = []
+        # Lower-cased id/name/qualname/path per node, joined by
+        # HAYSTACK_SEPARATOR, and a posting list of node indexes for every
+        # trigram that occurs in those fields.
+        self._haystacks: list[str] = []
+        self._gram_index: dict[str, array] = {}
+        self._nodes_by_type: dict[str | None, list[int]] = {}
+        # Filled on first use rather than here: mcp_server stamps the snapshot
+        # metadata onto the graph after constructing the service.
+        self._snapshot: GraphSnapshot | None = None
+        self._metadata: dict | None = None
         self._build_indexes()
 
     @classmethod
@@ -44,24 +89,30 @@ class GraphService:
         return cls(graph, graph_json_path=str(path))
 
     def snapshot(self) -> GraphSnapshot:
-        snapshot = self.graph.graph.get("snapshot", {}) if self.graph else {}
-        return GraphSnapshot(
-            source_root=snapshot.get("source_root"),
-            generated_at=snapshot.get("generated_at"),
-            node_count=self.graph.number_of_nodes(),
-            edge_count=self.graph.number_of_edges(),
-            graph_path=self.graph_json_path,
-        )
+        if self._snapshot is None:
+            snapshot = self.graph.graph.get("snapshot", {}) if self.graph else {}
+            self._snapshot = GraphSnapshot(
+                source_root=snapshot.get("source_root"),
+                generated_at=snapshot.get("generated_at"),
+                node_count=self.graph.number_of_nodes(),
+                edge_count=self.graph.number_of_edges(),
+                graph_path=self.graph_json_path,
+            )
+        return self._snapshot
 
     def metadata(self) -> dict:
-        snap = self.snapshot()
-        return {
-            "source_root": snap.source_root,
-            "generated_at": snap.generated_at,
-            "node_count": snap.node_count,
-            "edge_count": snap.edge_count,
-            "graph_path": snap.graph_path,
-        }
+        # Built once; each caller gets its own shallow copy (the values are
+        # scalars) so embedding and editing it cannot leak into later calls.
+        if self._metadata is None:
+            snap = self.snapshot()
+            self._metadata = {
+                "source_root": snap.source_root,
+                "generated_at": snap.generated_at,
+                "node_count": snap.node_count,
+                "edge_count": snap.edge_count,
+                "graph_path": snap.graph_path,
+            }
+        return dict(self._metadata)
 
     def search(
         self,
@@ -144,12 +195,13 @@ class GraphService:
 
         source_id = next(iter(source_ids))
         target_id = next(iter(target_ids))
-        graph = self._edge_filtered_graph(edge_types)
-        if not directed:
-            graph = graph.to_undirected()
-        try:
-            path = nx.shortest_path(graph, source_id, target_id)
-        except nx.NetworkXNoPath:
+        found = self._shortest_path(
+            self._id_to_idx[source_id],
+            self._id_to_idx[target_id],
+            edge_types=set(edge_types) if edge_types else None,
+            directed=directed,
+        )
+        if found is None:
             return {
                 "source": source,
                 "target": target,
@@ -162,10 +214,9 @@ class GraphService:
                 "error": "No path found",
             }
 
-        edges = []
-        for idx in range(len(path) - 1):
-            edge = (path[idx], path[idx + 1])
-            edges.append(self._edge_view(edge))
+        path_indexes, path_edges = found
+        path = [self._idx_to_id[idx] for idx in path_indexes]
+        edges = [self._edge_view(edge) for edge in path_edges]
 
         return {
             "source": source,
@@ -186,58 +237,64 @@ class GraphService:
         edge_types: list[str] | None = None,
         limit: int = 200,
     ) -> dict:
-        seed_ids, matched = self._resolve_seed_nodes(query, limit=5)
-        nodes, edges = self._bfs(
-            seed_ids,
-            direction=direction,
-            hops=hops,
-            edge_types=set(edge_types) if edge_types else None,
-            limit=limit,
-        )
-        return {
-            "query": query,
-            "matched": matched,
-            "direction": direction,
-            "hops": hops,
-            "nodes": [self._node_view(node_id) for node_id in nodes],
-            "edges": [self._edge_view(edge) for edge in edges],
-        }
-
-    def stats(self, edge_types: list[str] | None = None, limit: int = 10) -> dict:
-        node_counts: dict[str, int] = {}
-        for node_id, data in self.graph.nodes(data=True):
-            node_type = data.get("type", "Unknown")
-            node_counts[node_type] = node_counts.get(node_type, 0) + 1
+        return self.multi_subgraph([query], hops, direction, edge_types, limit)[0]
 
-        edge_counts: dict[str, int] = {}
-        for _, _, data in self.graph.edges(data=True):
-            edge_type = data.get("type", "Unknown")
-            edge_counts[edge_type] = edge_counts.get(edge_type, 0) + 1
+    def multi_subgraph(
+        self,
+        queries: Sequence[str],
+        hops: int = 1,
+        direction: str = "both",
+        edge_types: list[str] | None = None,
+        limit: int = 200,
+    ) -> list[dict]:
+        """One :meth:`subgraph` result per query, sharing traversal state.
+
+        A single visited buffer is reused (and cleared only where it was
+        written), so the per-query cost is proportional to the nodes reached
+        rather than to the size of the graph.
+        """
+        type_filter = set(edge_types) if edge_types else None
+        visited = bytearray(len(self._idx_to_id))
+        results = []
+        for query in queries:
+            seed_ids, matched = self._resolve_seed_nodes(query, limit=5)
+            nodes, edges = self._bfs(
+                seed_ids,
+                direction=direction,
+                hops=hops,
+                edge_types=type_filter,
+                limit=limit,
+                visited=visited,
+            )
+            results.append(
+                {
+                    "query": query,
+                    "matched": matched,
+                    "direction": direction,
+                    "hops": hops,
+                    "nodes": [self._node_view(node_id) for node_id in nodes],
+                    "edges": [self._edge_view(edge) for edge in edges],
+                }
+            )
+        return results
 
-        graph = self._edge_filtered_graph(edge_types)
-        degrees = graph.degree()
-        hubs = sorted(degrees, key=lambda item: item[1], reverse=True)[:limit]
+    def stats(self, edge_types: list[str] | None = None, limit: int = 10) -> dict:
+        degrees = self._degrees(edge_types)
+        hubs = heapq.nlargest(limit, range(len(degrees)), key=degrees.__getitem__)
         hubs_payload = [
-            {**self._node_view(node_id), "degree": degree}
-            for node_id, degree in hubs
+            {**self._node_view(self._idx_to_id[idx]), "degree": degrees[idx]}
+            for idx in hubs
         ]
 
-        module_counts: dict[str, int] = {}
-        for node_id, data in self.graph.nodes(data=True):
-            path = data.get("path")
-            if not path:
-                continue
-            group = _module_group_from_path(str(path))
-            module_counts[group] = module_counts.get(group, 0) + 1
-        module_breakdown = sorted(
-            module_counts.items(), key=lambda item: item[1], reverse=True
-        )[:limit]
+        module_breakdown = self._module_breakdown[:limit]
 
-        cluster_sizes = _cluster_sizes(graph, limit=limit)
+        cluster_sizes = _cluster_sizes(
+            len(self._idx_to_id), self._edge_pairs(edge_types), limit=limit
+        )
 
         return {
-            "node_counts": node_counts,
-            "edge_counts": edge_counts,
+            "node_counts": dict(self._node_counts),
+            "edge_counts": dict(self._edge_counts),
             "top_hubs": hubs_payload,
             "module_breakdown": [
                 {"module": module, "count": count}
@@ -247,24 +304,106 @@ class GraphService:
         }
 
     def _build_indexes(self) -> None:
+        node_counts = self._node_counts
+        module_counts = self._module_counts
+        # Many nodes share a file, so each distinct path is grouped once.
+        path_groups: dict[str, str] = {}
         for node_id, data in self.graph.nodes(data=True):
-            node = {
-                "id": node_id,
-                "type": data.get("type"),
-                "name": data.get("name"),
-                "qualname": data.get("qualname"),
-                "path": data.get("path"),
-                "external": bool(data.get("external")),
-            }
-            self._nodes.append(node)
-            self._node_by_id[node_id] = node
+            node_type = data.get("type", "Unknown")
+            node_counts[node_type] = node_counts.get(node_type, 0) + 1
+            if data.get("path"):
+                path_key = str(data["path"])
+                group = path_groups.get(path_key)
+                if group is None:
+                    group = path_groups[path_key] = _module_group_from_path(path_key)
+                module_counts[group] = module_counts.get(group, 0) + 1
+            name = data.get("name")
+            qualname = data.get("qualname")
+            path = data.get("path")
+            self._node_type.append(data.get("type"))
+            self._node_name.append(name)
+            self._node_qualname.append(qualname)
+            self._node_path.append(path)
+            self._node_external.append(bool(data.get("external")))
             self._index_exact("id", node_id, node_id)
-            if node.get("name"):
-                self._index_exact("name", node["name"], node_id)
-            if node.get("qualname"):
-                self._index_exact("qualname", node["qualname"], node_id)
-            if node.get("path"):
-                self._index_exact("path", node["path"], node_id)
+            if name:
+                self._index_exact("name", name, node_id)
+            if qualname:
+                self._index_exact("qualname", qualname, node_id)
+            if path:
+                self._index_exact("path", path, node_id)
+            idx = len(self._idx_to_id)
+            self._id_to_idx[node_id] = idx
+            self._idx_to_id.append(node_id)
+            fields = tuple(
+                str(value).lower()
+                for value in (node_id, name, qualname, path)
+                if value
+            )
+            self._haystacks.append(HAYSTACK_SEPARATOR.join(fields))
+            self._nodes_by_type.setdefault(data.get("type"), []).append(idx)
+            self._index_grams(idx, fields)
+
+        for key in ("path", "name", "qualname", "id"):
+            self._seed_index.update(self._exact_index[key])
+        self._module_breakdown = sorted(
+            module_counts.items(), key=lambda item: item[1], reverse=True
+        )
+
+        count = len(self._idx_to_id)
+        self._succ = [[] for _ in range(count)]
+        self._pred = [[] for _ in range(count)]
+        self._succ_edges = [[] for _ in range(count)]
+        self._pred_edges = [[] for _ in range(count)]
+        index = self._id_to_idx
+        edge_counts = self._edge_counts
+        for source, target, data in self.graph.edges(data=True):
+            u = index[source]
+            v = index[target]
+            edge_type = data.get("type", "Unknown")
+            edge_counts[edge_type] = edge_counts.get(edge_type, 0) + 1
+            edge = (u, v, edge_type)
+            self._succ[u].append(v)
+            self._succ_edges[u].append(edge)
+            self._pred[v].append(u)
+            self._pred_edges[v].append(edge)
+
+    def _index_grams(self, idx: int, fields: tuple[str, ...]) -> None:
+        size = SEARCH_GRAM_SIZE
+        grams = {
+            field[start : start + size]
+            for field in fields
+            for start in range(len(field) - size + 1)
+        }
+        for gram in grams:
+            postings = self._gram_index.get(gram)
+            if postings is None:
+                postings = self._gram_index[gram] = array("i")
+            postings.append(idx)
+
+    def _search_candidates(
+        self, q: str, node_types: list[str] | None
+    ) -> Iterable[int]:
+        """Node indexes, in node order, that can match ``q`` and ``node_types``."""
+        best: Sequence[int] = range(len(self._haystacks))
+        if node_types:
+            buckets = [
+                self._nodes_by_type.get(node_type, ())
+                for node_type in set(node_types)
+            ]
+            best = buckets[0] if len(buckets) == 1 else sorted(chain(*buckets))
+        size = SEARCH_GRAM_SIZE
+        if len(q) < size:
+            return best
+        # Every match contains every trigram of q, so the shortest posting
+        # list (already in node order) bounds the candidates.
+        for start in range(len(q) - size + 1):
+            postings = self._gram_index.get(q[start : start + size])
+            if postings is None:
+                return ()
+            if len(postings) < len(best):
+                best = postings
+        return best
 
     def _index_exact(self, key: str, value: str, node_id: str) -> None:
         bucket = self._exact_index[key]
@@ -274,73 +413,147 @@ class GraphService:
         self, query: str, node_types: list[str] | None, limit: int
     ) -> list[dict]:
         q = query.lower()
+        if HAYSTACK_SEPARATOR in q:
+            return []
+        haystacks = self._haystacks
         matches = []
-        for node in self._nodes:
-            if node_types and node.get("type") not in node_types:
+        for idx in self._search_candidates(q, node_types):
+            if node_types and self._node_type[idx] not in node_types:
                 continue
-            haystacks = [
-                str(node.get("id", "")),
-                str(node.get("name", "")),
-                str(node.get("qualname", "")),
-                str(node.get("path", "")),
-            ]
-            if any(q in haystack.lower() for haystack in haystacks if haystack):
-                matches.append(node)
+            if q in haystacks[idx]:
+                matches.append(self._node_record(idx))
                 if len(matches) >= limit:
                     break
         return matches
 
     def _resolve_seed_nodes(self, query: str, limit: int) -> tuple[set[str], list[dict]]:
-        query_lower = query.lower()
-        if query_lower in self._exact_index["id"]:
-            ids = set(self._exact_index["id"][query_lower])
+        bucket = self._seed_index.get(query.lower())
+        if bucket:
+            ids = set(bucket[:limit])
             return ids, [self._node_view(node_id) for node_id in ids]
 
-        for key in ("qualname", "name", "path"):
-            bucket = self._exact_index[key].get(query_lower)
-            if bucket:
-                ids = set(bucket[:limit])
-                return ids, [self._node_view(node_id) for node_id in ids]
-
         matches = self._search_nodes(query, node_types=None, limit=limit)
         ids = {node["id"] for node in matches}
         return ids, [self._node_view(node_id) for node_id in ids]
 
     def _node_view(self, node_id: str) -> dict:
-        node = self._node_by_id.get(node_id)
-        if not node:
+        idx = self._id_to_idx.get(node_id)
+        if idx is None:
             return {"id": node_id}
+        return self._node_record(idx)
+
+    def _node_record(self, idx: int) -> dict:
         return {
-            "id": node_id,
-            "type": node.get("type"),
-            "name": node.get("name"),
-            "qualname": node.get("qualname"),
-            "path": node.get("path"),
-            "external": node.get("external"),
+            "id": self._idx_to_id[idx],
+            "type": self._node_type[idx],
+            "name": self._node_name[idx],
+            "qualname": self._node_qualname[idx],
+            "path": self._node_path[idx],
+            "external": bool(self._node_external[idx]),
         }
 
-    def _edge_view(self, edge: tuple[str, str]) -> dict:
-        source, target = edge
-        data = self.graph.get_edge_data(source, target) or {}
+    def _edge_view(self, edge: _Edge) -> dict:
+        source, target, edge_type = edge
         return {
-            "source": source,
-            "target": target,
-            "type": data.get("type", "Unknown"),
+            "source": self._idx_to_id[source],
+            "target": self._idx_to_id[target],
+            "type": edge_type,
         }
 
-    def _edge_filtered_graph(self, edge_types: list[str] | None) -> nx.DiGraph:
+    def _degrees(self, edge_types: list[str] | None) -> list[int]:
+        """In- plus out-degree per node index, counting only ``edge_types``."""
         if not edge_types:
-            return self.graph
-        allowed = set(edge_types)
-        edges = [
-            (u, v, data)
-            for u, v, data in self.graph.edges(data=True)
-            if data.get("type") in allowed
-        ]
-        graph = nx.DiGraph()
-        graph.add_nodes_from(self.graph.nodes(data=True))
-        graph.add_edges_from(edges)
-        return graph
+            return [len(succ) + len(pred) for succ, pred in zip(self._succ, self._pred)]
+        degrees = [0] * len(self._idx_to_id)
+        for u, v in self._edge_pairs(edge_types):
+            degrees[u] += 1
+            degrees[v] += 1
+        return degrees
+
+    def _edge_pairs(self, edge_types: list[str] | None) -> Iterator[tuple[int, int]]:
+        allowed = set(edge_types) if edge_types else None
+        for edges in self._succ_edges:
+            for u, v, edge_type in edges:
+                if allowed is None or edge_type in allowed:
+                    yield u, v
+
+    def _rows(self, outgoing: bool, edge_types: set[str] | None) -> _Adjacency:
+        """Successor or predecessor rows holding only ``edge_types`` edges."""
+        rows = (
+            (self._succ, self._succ_edges) if outgoing else (self._pred, self._pred_edges)
+        )
+        if edge_types is None:
+            return rows
+        # Unknown types can never match, so the cache key is bounded by the
+        # edge types actually present in the graph.
+        allowed = frozenset(edge_types).intersection(self._edge_counts)
+        if len(allowed) == len(self._edge_counts):
+            return rows
+        key = (outgoing, allowed)
+        filtered = self._filtered_rows.get(key)
+        if filtered is None:
+            neighbor_rows: list[list[int]] = []
+            edge_rows: list[list[_Edge]] = []
+            end = 1 if outgoing else 0
+            for edges in rows[1]:
+                kept = [edge for edge in edges if edge[2] in allowed]
+                edge_rows.append(kept)
+                neighbor_rows.append([edge[end] for edge in kept])
+            filtered = self._filtered_rows[key] = (neighbor_rows, edge_rows)
+        return filtered
+
+    def _shortest_path(
+        self,
+        source: int,
+        target: int,
+        edge_types: set[str] | None,
+        directed: bool,
+    ) -> tuple[list[int], list[_Edge]] | None:
+        """Bidirectional BFS; returns the node indexes and edges from source to target.
+
+        Edges keep their stored direction, which for undirected searches may
+        run against the order of the path.
+        """
+        if source == target:
+            return [source], []
+        forward = [self._rows(True, edge_types)]
+        backward = [self._rows(False, edge_types)]
+        if not directed:
+            forward = backward = forward + backward
+
+        # Each side maps a reached node to the neighbour it was reached from
+        # and the edge between them.
+        from_source: dict[int, _Hop | None] = {source: None}
+        from_target: dict[int, _Hop | None] = {target: None}
+        source_frontier = [source]
+        target_frontier = [target]
+        while source_frontier and target_frontier:
+            if len(source_frontier) <= len(target_frontier):
+                source_frontier, meet = _expand_frontier(
+                    source_frontier, forward, from_source, from_target
+                )
+            else:
+                target_frontier, meet = _expand_frontier(
+                    target_frontier, backward, from_target, from_source
+                )
+            if meet is None:
+                continue
+            nodes = [meet]
+            edges: list[_Edge] = []
+            hop = from_source[meet]
+            while hop is not None:
+                nodes.append(hop[0])
+                edges.append(hop[1])
+                hop = from_source[hop[0]]
+            nodes.reverse()
+            edges.reverse()
+            hop = from_target[meet]
+            while hop is not None:
+                nodes.append(hop[0])
+                edges.append(hop[1])
+                hop = from_target[hop[0]]
+            return nodes, edges
+        return None
 
     def _bfs(
         self,
@@ -349,45 +562,102 @@ class GraphService:
         hops: int,
         edge_types: set[str] | None,
         limit: int,
-    ) -> tuple[list[str], list[tuple[str, str]]]:
+        visited: bytearray | None = None,
+    ) -> tuple[list[str], list[_Edge]]:
+        """BFS from ``seed_ids``; a caller-owned, all-zero ``visited`` is left all-zero."""
         if not seed_ids:
             return [], []
-        visited = set(seed_ids)
-        frontier = set(seed_ids)
-        edges: set[tuple[str, str]] = set()
-
-        for _ in range(max(hops, 1)):
-            if not frontier:
-                break
-            next_frontier = set()
-            for node_id in frontier:
-                if direction in ("outgoing", "both"):
-                    for neighbor in self.graph.successors(node_id):
-                        if not self._edge_allowed(node_id, neighbor, edge_types):
-                            continue
-                        edges.add((node_id, neighbor))
-                        if neighbor not in visited and len(visited) < limit:
-                            visited.add(neighbor)
-                            next_frontier.add(neighbor)
-                if direction in ("incoming", "both"):
-                    for neighbor in self.graph.predecessors(node_id):
-                        if not self._edge_allowed(neighbor, node_id, edge_types):
-                            continue
-                        edges.add((neighbor, node_id))
-                        if neighbor not in visited and len(visited) < limit:
-                            visited.add(neighbor)
-                            next_frontier.add(neighbor)
-            frontier = next_frontier
-
-        return list(visited), list(edges)
-
-    def _edge_allowed(
-        self, source: str, target: str, edge_types: set[str] | None
-    ) -> bool:
-        if edge_types is None:
-            return True
-        data = self.graph.get_edge_data(source, target) or {}
-        return data.get("type") in edge_types
+        index = self._id_to_idx
+        scratch = visited is not None
+        if visited is None:
+            visited = bytearray(len(self._idx_to_id))
+        order: list[int] = []
+        for node_id in seed_ids:
+            idx = index[node_id]
+            if not visited[idx]:
+                visited[idx] = 1
+                order.append(idx)
+
+        # The direction is decoded once here; the kernel only sees the rows
+        # to follow, and the shared edge tuples are already oriented.
+        adjacency = []
+        if direction in ("outgoing", "both"):
+            adjacency.append(self._rows(True, edge_types))
+        if direction in ("incoming", "both"):
+            adjacency.append(self._rows(False, edge_types))
+
+        order, edges = _bfs_kernel(
+            adjacency, order, visited, max(hops, 1), limit
+        )
+        if scratch:
+            # The kernel marks exactly the nodes it appends to ``order``.
+            for idx in order:
+                visited[idx] = 0
+        ids = self._idx_to_id
+        return [ids[idx] for idx in order], _unique(edges)
+
+
+def _bfs_kernel(
+    adjacency: list[_Adjacency],
+    order: list[int],
+    visited: bytearray,
+    hops: int,
+    limit: int,
+) -> tuple[list[int], list[_Edge]]:
+    """Level-order BFS over index adjacency lists, starting from ``order``.
+
+    ``visited`` must already be set for the seeds in ``order``; nodes are
+    appended to ``order`` as they are reached, up to ``limit`` in total.
+    """
+    frontier = list(order)
+    edges: list[_Edge] = []
+    add_edge = edges.append
+    remaining = limit - len(order)
+    for _ in range(hops):
+        if not frontier or remaining <= 0:
+            break
+        next_frontier: list[int] = []
+        for u in frontier:
+            for neighbors, edge_rows in adjacency:
+                for v, edge in zip(neighbors[u], edge_rows[u]):
+                    add_edge(edge)
+                    if visited[v]:
+                        continue
+                    visited[v] = 1
+                    next_frontier.append(v)
+                    remaining -= 1
+                    # Nothing else can be visited once the cap is hit.
+                    if not remaining:
+                        order.extend(next_frontier)
+                        return order, edges
+        order.extend(next_frontier)
+        frontier = next_frontier
+    return order, edges
+
+
+def _unique(edges: list[_Edge]) -> list[_Edge]:
+    # Each node is expanded once per direction, so repeats only come from
+    # direction="both" seeing an edge from both of its ends.
+    return list(dict.fromkeys(edges))
+
+
+def _expand_frontier(
+    frontier: list[int],
+    adjacency: list[_Adjacency],
+    reached: dict[int, _Hop | None],
+    other_side: dict[int, _Hop | None],
+) -> tuple[list[int], int | None]:
+    next_frontier: list[int] = []
+    for u in frontier:
+        for neighbors, edge_rows in adjacency:
+            for v, edge in zip(neighbors[u], edge_rows[u]):
+                if v in reached:
+                    continue
+                reached[v] = (u, edge)
+                if v in other_side:
+                    return next_frontier, v
+                next_frontier.append(v)
+    return next_frontier, None
 
 
 def _module_group_from_path(path: str) -> str:
@@ -402,20 +672,44 @@ def _module_group_from_path(path: str) -> str:
     return parts[-2] if len(parts) >= 2 else (parts[0] if parts else "root")
 
 
-def _cluster_sizes(graph: nx.Graph, limit: int = 10) -> list[dict]:
-    if graph.number_of_nodes() == 0:
+def _cluster_sizes(
+    count: int, edges: Iterable[tuple[int, int]], limit: int = 10
+) -> list[dict]:
+    """Sizes of the weakly connected components, largest first."""
+    if count == 0:
         return []
-    undirected = graph.to_undirected()
-    clusters = [
-        len(component) for component in nx.connected_components(undirected)
-    ]
-    clusters.sort(reverse=True)
+    clusters = sorted(_union_find_component_sizes(count, edges), reverse=True)
     return [
         {"cluster": idx + 1, "size": size}
         for idx, size in enumerate(clusters[:limit])
     ]
 
 
+def _union_find_component_sizes(
+    count: int, edges: Iterable[tuple[int, int]]
+) -> list[int]:
+    parent = list(range(count))
+    size = [1] * count
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for u, v in edges:
+        root_u = find(u)
+        root_v = find(v)
+        if root_u == root_v:
+            continue
+        if size[root_u] < size[root_v]:
+            root_u, root_v = root_v, root_u
+        parent[root_v] = root_u
+        size[root_u] += size[root_v]
+
+    return [size[node] for node in range(count) if parent[node] == node]
+
+
 def ensure_snapshot(graph: nx.DiGraph, source_root: str | None = None) -> None:
     snapshot = graph.graph.get("snapshot")
     if snapshot:
@@ -2,17 +2,64 @@
 
 from __future__ import annotations
 
-import json
 import os
 from dataclasses import dataclass
 from typing import Any
 
+from . import json_utils
 from .mcp_graph import GraphService
-from .llm_utils import extract_content, parse_json_content, repair_json_content
+from .llm_utils import extract_content, parse_json_content, repair_json_content, text_part
 from .openrouter_client import OpenRouterConfig, OpenRouterRequestError, chat_completions
 
 
-@dataclass(frozen=True)
+SYSTEM_PROMPT = (
+    "You are a senior migration architect. Produce a clear, actionable migration plan "
+    "for a legacy codebase. Output must be valid JSON only. "
+    "The plan should be specific, phased, include risks, validation, and Mermaid diagrams."
+)
+
+PLAN_OUTPUT_SCHEMA = {
+    "title": "string",
+    "summary": "string",
+    "assumptions": ["string"],
+    "scope": "string",
+    "phases": [
+        {
+            "name": "string",
+            "goal": "string",
+            "steps": ["string"],
+            "deliverables": ["string"],
+            "checks": ["string"],
+        }
+    ],
+    "risks": ["string"],
+    "validation": ["string"],
+    "checklist": ["string"],
+    "mermaid": [
+        {"title": "string", "diagram": "string"}
+    ],
+    "cursor_prompt": "string",
+    "plan_markdown": "string",
+    "plan_markdown_lines": ["string"],
+}
+
+PLAN_INSTRUCTIONS = (
+    "Return a JSON object matching output_schema. "
+    "Make cursor_prompt explicitly instruct the agent to create the plan file "
+    "named plan_filename using Markdown headings, checklists, and Mermaid code fences. "
+    "Include at least one flowchart and one sequence or graph diagram. "
+    "If outline_only is true, keep phases and plan_markdown short. "
+    "If plan_markdown would be long, prefer plan_markdown_lines to avoid escaping issues."
+)
+
+# Identical for every request, so it leads the user message where providers
+# can cache it; the request-specific JSON follows in a second part.
+_USER_PROMPT_PREFIX = json_utils.dumps(
+    {"output_schema": PLAN_OUTPUT_SCHEMA, "instructions": PLAN_INSTRUCTIONS}
+).decode("utf-8")
+
+
+@dataclass(frozen=True, slots=True)
 class MigrationPlanRequest:
     goal: str
     target_stack: str | None = None
@@ -28,7 +75,7 @@ class MigrationPlanRequest:
     max_edges: int = 120
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MigrationPlanResult:
     model: str
     plan: dict[str, Any] | None
@@ -56,23 +103,17 @@ def generate_migration_plan(
             max_edges=request.max_edges,
         )
 
-    system_prompt = (
-        "You are a senior migration architect. Produce a clear, actionable migration plan "
-        "for a legacy codebase. Output must be valid JSON only. "
-        "The plan should be specific, phased, include risks, validation, and Mermaid diagrams."
-    )
-
-    user_prompt = build_user_prompt(request, graph_context)
+    messages = [
+        {"role": "system", "content": [text_part(SYSTEM_PROMPT, cacheable=True)]},
+        {"role": "user", "content": build_user_prompt(request, graph_context)},
+    ]
 
     response = None
     error_message = None
     try:
         response = chat_completions(
             config,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=messages,
             response_format={"type": "json_object"},
         )
     except OpenRouterRequestError as exc:
@@ -82,10 +123,7 @@ def generate_migration_plan(
             try:
                 response = chat_completions(
                     config,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
+                    messages=messages,
                     response_format=None,
                 )
                 error_message = None
@@ -110,10 +148,7 @@ def generate_migration_plan(
             error = parse_error
 
         if isinstance(plan_data, dict):
-            cursor_prompt = plan_data.get("cursor_prompt")
-            plan_markdown = plan_data.get("plan_markdown")
-            if plan_markdown is None and plan_data.get("plan_markdown_lines"):
-                plan_markdown = "\n".join(plan_data.get("plan_markdown_lines", []))
+            cursor_prompt, plan_markdown = _plan_outputs(plan_data)
     else:
         if error is None:
             error = "No content returned from model"
@@ -133,6 +168,18 @@ def generate_migration_plan(
 
 
 
+def _plan_outputs(plan_data: dict[str, Any]) -> tuple[str | None, str | None]:
+    """Return ``(cursor_prompt, plan_markdown)`` from a parsed plan.
+
+    ``plan_markdown`` falls back to joining ``plan_markdown_lines``.
+    """
+    plan_markdown = plan_data.get("plan_markdown")
+    if plan_markdown is None:
+        lines = plan_data.get("plan_markdown_lines")
+        if lines:
+            plan_markdown = "\n".join(lines)
+    return plan_data.get("cursor_prompt"), plan_markdown
+
 
 def build_graph_context(
     service: GraphService,
@@ -150,14 +197,14 @@ def build_graph_context(
 
     subgraphs = []
     if seed_queries:
-        for query in seed_queries:
-            subgraph = service.subgraph(
-                query,
-                hops=hops,
-                direction="both",
-                edge_types=edge_types,
-                limit=max_nodes,
-            )
+        results = service.multi_subgraph(
+            seed_queries,
+            hops=hops,
+            direction="both",
+            edge_types=edge_types,
+            limit=max_nodes,
+        )
+        for query, subgraph in zip(seed_queries, results):
             nodes = subgraph.get("nodes", [])[:max_nodes]
             edges = subgraph.get("edges", [])[:max_edges]
             subgraphs.append(
@@ -171,7 +218,10 @@ def build_graph_context(
     return context
 
 
-def build_user_prompt(request: MigrationPlanRequest, graph_context: dict[str, Any] | None) -> str:
+def build_user_prompt(
+    request: MigrationPlanRequest, graph_context: dict[str, Any] | None
+) -> list[dict[str, Any]]:
+    """User message parts: the shared schema/instructions, then this request."""
     constraints = request.constraints or []
     seed_queries = request.seed_queries or []
 
@@ -184,40 +234,11 @@ def build_user_prompt(request: MigrationPlanRequest, graph_context: dict[str, An
         "outline_only": request.outline_only,
         "plan_filename": request.plan_filename,
         "graph_context": graph_context,
-        "output_schema": {
-            "title": "string",
-            "summary": "string",
-            "assumptions": ["string"],
-            "scope": "string",
-            "phases": [
-                {
-                    "name": "string",
-                    "goal": "string",
-                    "steps": ["string"],
-                    "deliverables": ["string"],
-                    "checks": ["string"],
-                }
-            ],
-            "risks": ["string"],
-            "validation": ["string"],
-            "checklist": ["string"],
-            "mermaid": [
-                {"title": "string", "diagram": "string"}
-            ],
-            "cursor_prompt": "string",
-            "plan_markdown": "string",
-            "plan_markdown_lines": ["string"],
-        },
-        "instructions": (
-            "Return a JSON object matching output_schema. "
-            "Make cursor_prompt explicitly instruct the agent to create the plan file "
-            "named plan_filename using Markdown headings, checklists, and Mermaid code fences. "
-            "Include at least one flowchart and one sequence or graph diagram. "
-            "If outline_only is true, keep phases and plan_markdown short. "
-            "If plan_markdown would be long, prefer plan_markdown_lines to avoid escaping issues."
-        ),
     }
-    return json.dumps(prompt, indent=2)
+    return [
+        text_part(_USER_PROMPT_PREFIX, cacheable=True),
+        text_part(json_utils.dumps(prompt).decode("utf-8")),
+    ]
 
 
 def resolve_openrouter_config() -> OpenRouterConfig:
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import atexit
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 import httpx
 
+from . import json_utils
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class OpenRouterConfig:
     api_key: str
     model: str
@@ -18,6 +28,37 @@ class OpenRouterConfig:
     timeout_seconds: float = 60.0
 
 
+# HTTP/2 needs the optional h2 package (httpx[http2]).
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_clients: dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_client(config: OpenRouterConfig) -> httpx.Client:
+    # One keep-alive client per base URL so repeated completions reuse the
+    # connection instead of paying a TCP+TLS handshake each time.
+    client = _clients.get(config.base_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(config.base_url)
+            if client is None:
+                client = httpx.Client(http2=_HTTP2)
+                _clients[config.base_url] = client
+    return client
+
+
+@atexit.register
+def _close_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
 class OpenRouterRequestError(RuntimeError):
     def __init__(self, status_code: int, payload: Any) -> None:
         super().__init__(f"OpenRouter request failed ({status_code})")
@@ -30,6 +71,94 @@ def chat_completions(
     messages: list[dict[str, Any]],
     response_format: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
+    url, headers, payload = _prepare_request(config, messages, response_format)
+    key = _request_key(config, payload)
+
+    # An identical request already running in another thread (concurrent
+    # workflow seeds, or overlapping runs in one server) is joined rather
+    # than sent again; its result or exception is shared.
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = _send(config, url, headers, payload, key)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def _send(
+    config: OpenRouterConfig,
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    key: str,
+) -> dict[str, Any]:
+    cache_path = _cache_path(key)
+    if cache_path is not None:
+        cached = _read_cached(cache_path)
+        if cached is not None:
+            return cached
+
+    response = _get_client(config).post(
+        url, headers=headers, json=payload, timeout=config.timeout_seconds
+    )
+    result = _decode_response(response)
+    if cache_path is not None and _is_cacheable(result):
+        _write_cached(cache_path, response.content)
+    return result
+
+
+async def chat_completions_async(
+    config: OpenRouterConfig,
+    messages: list[dict[str, Any]],
+    response_format: dict[str, Any] | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> dict[str, Any]:
+    """Async :func:`chat_completions` for callers already on an event loop.
+
+    Async clients are bound to the loop they were created on, so none is
+    cached here: pass ``client`` to reuse one connection pool across calls,
+    otherwise a client is opened for this request only.
+    """
+    url, headers, payload = _prepare_request(config, messages, response_format)
+    cache_path = _cache_path(_request_key(config, payload))
+    if cache_path is not None:
+        cached = _read_cached(cache_path)
+        if cached is not None:
+            return cached
+
+    if client is None:
+        async with httpx.AsyncClient(http2=_HTTP2) as own_client:
+            response = await own_client.post(
+                url, headers=headers, json=payload, timeout=config.timeout_seconds
+            )
+    else:
+        response = await client.post(
+            url, headers=headers, json=payload, timeout=config.timeout_seconds
+        )
+    result = _decode_response(response)
+    if cache_path is not None and _is_cacheable(result):
+        _write_cached(cache_path, response.content)
+    return result
+
+
+def _prepare_request(
+    config: OpenRouterConfig,
+    messages: list[dict[str, Any]],
+    response_format: dict[str, Any] | None,
+) -> tuple[str, dict[str, str], dict[str, Any]]:
     url = f"{config.base_url.rstrip('/')}/chat/completions"
     headers = {
         "Authorization": f"Bearer {config.api_key}",
@@ -46,16 +175,73 @@ def chat_completions(
     }
     if response_format:
         payload["response_format"] = response_format
+    return url, headers, payload
 
-    response = httpx.post(
-        url, headers=headers, json=payload, timeout=config.timeout_seconds
-    )
+
+def _decode_response(response: httpx.Response) -> dict[str, Any]:
     try:
         response.raise_for_status()
     except httpx.HTTPStatusError as exc:
         try:
-            payload = response.json()
+            payload = json_utils.loads(response.content)
         except Exception:
             payload = response.text
         raise OpenRouterRequestError(response.status_code, payload) from exc
-    return response.json()
+    # httpx's response.json() goes through the stdlib decoder; completions
+    # carry the whole generated plan, so decode with orjson when available.
+    return json_utils.loads(response.content)
+
+
+def _request_key(config: OpenRouterConfig, payload: dict[str, Any]) -> str:
+    """Digest identifying a request by endpoint, model, messages and response_format."""
+    key_source = json.dumps(
+        {"base_url": config.base_url, **payload}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> Path | None:
+    """On-disk location for a completion, or None when caching is disabled.
+
+    Caching is opt-in because stored requests include the prompts (source
+    code): set LLM_CACHE_DIR to enable it, and LLM_CACHE_DISABLE=1 to bypass
+    it for a run.
+    """
+    if os.getenv("LLM_CACHE_DISABLE", "").lower() in {"1", "true", "yes"}:
+        return None
+    root = os.getenv("LLM_CACHE_DIR")
+    if not root:
+        return None
+    return Path(root) / f"{key}.json"
+
+
+def _is_cacheable(result: dict[str, Any]) -> bool:
+    # A 200 can still carry an error object or an empty completion; caching
+    # one would replay it on every later run.
+    if "error" in result:
+        return False
+    try:
+        return bool(result["choices"][0]["message"]["content"])
+    except (KeyError, IndexError, TypeError):
+        return False
+
+
+def _read_cached(path: Path) -> dict[str, Any] | None:
+    try:
+        return json_utils.loads(path.read_bytes())
+    except (OSError, json_utils.JSONDecodeError):
+        return None
+
+
+def _write_cached(path: Path, body: bytes) -> None:
+    # The response body is stored as received: it already decoded once, so
+    # there is no need to build a second, re-encoded copy of a large plan.
+    # Write-then-rename so concurrent readers never see a partial file; a
+    # cache that cannot be written is simply skipped.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import mmap
+import threading
 from dataclasses import dataclass
 from typing import Iterable
 
@@ -10,10 +12,26 @@ from tree_sitter import Parser
 from .ts_lang import load_python_language
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedSource:
     tree: object
-    source_bytes: bytes
+    # Either bytes or a read-only mmap; both slice to bytes.
+    source_bytes: bytes | mmap.mmap
+
+
+def read_source(path: str) -> bytes | mmap.mmap:
+    """Map ``path`` read-only, falling back to a plain read.
+
+    Tree-sitter and hashlib both accept the mapping directly, so the file is
+    parsed from the page cache without first being copied into a ``bytes``.
+    Empty files cannot be mapped and are read instead. Callers own the
+    mapping and should close it as soon as they are done with it.
+    """
+    with open(path, "rb") as handle:
+        try:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return handle.read()
 
 
 class PythonParser:
@@ -26,7 +44,7 @@ class PythonParser:
         else:  # pragma: no cover - legacy API
             self._parser.language = language
 
-    def parse_bytes(self, source_bytes: bytes) -> ParsedSource:
+    def parse_bytes(self, source_bytes: bytes | mmap.mmap) -> ParsedSource:
         tree = self._parser.parse(source_bytes)
         return ParsedSource(tree=tree, source_bytes=source_bytes)
 
@@ -34,9 +52,25 @@ class PythonParser:
         return self.parse_bytes(source_text.encode("utf-8"))
 
     def parse_file(self, path: str) -> ParsedSource:
+        # The result outlives this call, so read bytes rather than hand the
+        # caller an open mapping.
         with open(path, "rb") as handle:
-            source_bytes = handle.read()
-        return self.parse_bytes(source_bytes)
+            return self.parse_bytes(handle.read())
+
+
+_thread_state = threading.local()
+
+
+def get_default_parser() -> PythonParser:
+    """Return a shared parser for the calling thread, creating it on first use.
+
+    Tree-sitter parsers are not safe to share between threads, so each thread
+    (and each worker process) gets its own instance.
+    """
+    parser = getattr(_thread_state, "parser", None)
+    if parser is None:
+        parser = _thread_state.parser = PythonParser()
+    return parser
 
 
 def parse_files(parser: PythonParser, paths: Iterable[str]) -> Iterable[tuple[str, ParsedSource]]:
@@ -3,16 +3,34 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 from .extract import extract_symbols
 from .file_walker import iter_python_files
 from .graph import build_graph
-from .parser import PythonParser
+from .parser import get_default_parser, read_source
 from .storage import save_graph
 
 
+# Below this many files the cost of starting worker processes outweighs the gain.
+PARALLEL_MIN_FILES = 64
+
+# Extraction results kept per process, keyed by a digest of the file contents.
+# The API's pool workers live for the whole server, so keep this small: the
+# hits worth having are duplicated files within and across uploads.
+EXTRACT_CACHE_SIZE = 2_048
+
+_extract_cache: OrderedDict[bytes, dict] = OrderedDict()
+_extract_cache_lock = threading.Lock()
+
+
 def _candidate_roots() -> tuple[Path, Path]:
     return (
         Path.cwd() / "jwst-main",
@@ -29,21 +47,69 @@ def resolve_root(root: str | None) -> Path:
     return _candidate_roots()[0]
 
 
+def _parse_and_extract(path: str) -> dict:
+    source_bytes = read_source(path)
+    try:
+        return _extract_cached(source_bytes, path)
+    finally:
+        # Close the mapping now rather than at garbage collection: an open map
+        # blocks temp dir cleanup on Windows and pins the file's pages.
+        if isinstance(source_bytes, mmap.mmap):
+            source_bytes.close()
+
+
+def _extract_cached(source_bytes: bytes | mmap.mmap, path: str) -> dict:
+    # Keyed on content rather than path/mtime: /parse extracts every upload
+    # into a fresh temp dir, and identical files (empty __init__.py) are common.
+    key = hashlib.blake2b(source_bytes, digest_size=16).digest()
+    with _extract_cache_lock:
+        cached = _extract_cache.get(key)
+        if cached is not None:
+            _extract_cache.move_to_end(key)
+    if cached is not None:
+        return _copy_extracted(cached, path)
+
+    extracted = extract_symbols(get_default_parser().parse_bytes(source_bytes), path=path)
+    with _extract_cache_lock:
+        _extract_cache[key] = extracted
+        if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+            _extract_cache.popitem(last=False)
+    return _copy_extracted(extracted, path)
+
+
+def _copy_extracted(extracted: dict, path: str) -> dict:
+    # Fresh lists per result, so a caller mutating one cannot alter the cache.
+    result = {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in extracted.items()
+    }
+    result["path"] = path
+    return result
+
+
+def extract_files(files: list[str], workers: int | None = None) -> list[dict]:
+    """Parse and extract every file, fanning out to worker processes for large inputs."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(files) < PARALLEL_MIN_FILES:
+        return [_parse_and_extract(path) for path in files]
+
+    chunksize = max(1, len(files) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_and_extract, files, chunksize=chunksize))
+
+
 def build_graph_from_root(
     root: str | Path,
     output_path: str | Path | None = None,
     max_files: int | None = None,
+    workers: int | None = None,
 ) -> object:
     root_path = Path(root)
     files = iter_python_files(root_path)
     if max_files is not None:
         files = files[:max_files]
 
-    parser = PythonParser()
-    extracted = []
-    for path in files:
-        parsed = parser.parse_file(path)
-        extracted.append(extract_symbols(parsed, path=path))
+    extracted = extract_files(files, workers=workers)
 
     graph = build_graph(extracted)
     graph.graph["snapshot"] = {
@@ -73,10 +139,16 @@ def main() -> int:
         default=None,
         help="Limit number of files parsed (for quick checks)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for parsing (default: CPU count, 1 disables)",
+    )
     args = parser.parse_args()
 
     root = resolve_root(args.root)
-    graph = build_graph_from_root(root, args.output, args.max_files)
+    graph = build_graph_from_root(root, args.output, args.max_files, workers=args.jobs)
     print(graph.number_of_nodes(), graph.number_of_edges())
     return 0
 
@@ -1,19 +1,170 @@
-"""JSON serialization helpers for NetworkX graphs."""
+"""JSON and binary serialization helpers for NetworkX graphs."""
 
 from __future__ import annotations
 
-import json
+import gzip
+import pickle
+from array import array
 from pathlib import Path
+from typing import Any, BinaryIO
 
 import networkx as nx
 from networkx.readwrite import json_graph
 
+from . import json_utils
+
+
+BINARY_SUFFIXES = frozenset({".pkl", ".pickle"})
+_BINARY_FORMAT = "codeintel-columnar-v1"
+
 
 def save_graph(graph: nx.DiGraph, path: str | Path) -> None:
-    data = json_graph.node_link_data(graph)
-    Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    """Write node-link JSON; a ``.gz`` suffix writes it compact and gzipped.
+
+    A ``.pkl``/``.pickle`` suffix writes the columnar binary format instead.
+    """
+    path = Path(path)
+    if path.suffix in BINARY_SUFFIXES:
+        with path.open("wb") as handle:
+            pickle.dump(_pack_columns(graph), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        return
+    if path.suffix == ".gz":
+        with gzip.open(path, "wb", compresslevel=6) as handle:
+            _write_node_link(graph, handle, indent=False)
+    else:
+        with path.open("wb") as handle:
+            _write_node_link(graph, handle, indent=True)
+
+
+def _write_node_link(graph: nx.DiGraph, handle: BinaryIO, *, indent: bool) -> None:
+    """Stream node-link JSON one node/edge record at a time.
+
+    The output matches ``json_utils.dumps(node_link_data(graph))`` byte for
+    byte, but the full document is never held in memory.
+    """
+    if graph.is_multigraph():
+        handle.write(json_utils.dumps(json_graph.node_link_data(graph), indent=indent))
+        return
+    sections = (
+        ("nodes", ({**attrs, "id": node} for node, attrs in graph.nodes(data=True))),
+        (
+            "edges",
+            (
+                {**attrs, "source": source, "target": target}
+                for source, target, attrs in graph.edges(data=True)
+            ),
+        ),
+    )
+    head = json_utils.dumps(
+        {"directed": graph.is_directed(), "multigraph": False, "graph": graph.graph},
+        indent=indent,
+    )
+    # Reopen the header object by dropping its closing brace.
+    handle.write(head[:-2] if indent else head[:-1])
+    for key, records in sections:
+        handle.write(f',\n  "{key}": ['.encode() if indent else f',"{key}":['.encode())
+        separator = b"\n    " if indent else b""
+        empty = True
+        for record in records:
+            encoded = json_utils.dumps(record, indent=indent)
+            if indent:
+                encoded = encoded.replace(b"\n", b"\n    ")
+            handle.write(separator)
+            handle.write(encoded)
+            separator = b",\n    " if indent else b","
+            empty = False
+        handle.write(b"]" if empty or not indent else b"\n  ]")
+    handle.write(b"\n}" if indent else b"}")
 
 
 def load_graph(path: str | Path) -> nx.DiGraph:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
-    return json_graph.node_link_graph(data, directed=True)
\ No newline at end of file
+    """Read a graph written by :func:`save_graph`.
+
+    Binary files are unpickled, so only load ones you produced yourself.
+    """
+    path = Path(path)
+    if path.suffix in BINARY_SUFFIXES:
+        with path.open("rb") as handle:
+            return _unpack_columns(pickle.load(handle))
+    raw = path.read_bytes()
+    if path.suffix == ".gz":
+        raw = gzip.decompress(raw)
+    data = json_utils.loads(raw)
+    if data.get("multigraph") or "edges" not in data:
+        return json_graph.node_link_graph(data, directed=True)
+
+    # Build the DiGraph straight from the node-link lists; the decoded dicts
+    # are fresh, so they become the attribute dicts without copying.
+    graph = nx.DiGraph()
+    graph.graph.update(data.get("graph", {}))
+    graph.add_nodes_from((node.pop("id"), node) for node in data["nodes"])
+    graph.add_edges_from(
+        (edge.pop("source"), edge.pop("target"), edge) for edge in data["edges"]
+    )
+    return graph
+
+
+def _columns(rows: list[dict[str, Any]]) -> dict[str, tuple[list[Any], array]]:
+    """Split attribute dicts into one value list per key.
+
+    Each column carries the row indexes that lack the key, so sparse
+    attributes round-trip without inventing values.
+    """
+    keys = dict.fromkeys(key for row in rows for key in row)
+    columns = {}
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        missing = array("i", (i for i, row in enumerate(rows) if key not in row))
+        columns[key] = (values, missing)
+    return columns
+
+
+def _rows(count: int, columns: dict[str, tuple[list[Any], array]]) -> list[dict[str, Any]]:
+    keys = list(columns)
+    if keys:
+        rows = [dict(zip(keys, values)) for values in zip(*(columns[key][0] for key in keys))]
+    else:
+        rows = [{} for _ in range(count)]
+    for key in keys:
+        for i in columns[key][1]:
+            del rows[i][key]
+    return rows
+
+
+def _pack_columns(graph: nx.DiGraph) -> dict[str, Any]:
+    node_ids = list(graph.nodes)
+    index = {node: i for i, node in enumerate(node_ids)}
+    sources = array("i")
+    targets = array("i")
+    edge_rows = []
+    for source, target, attrs in graph.edges(data=True):
+        sources.append(index[source])
+        targets.append(index[target])
+        edge_rows.append(attrs)
+    return {
+        "format": _BINARY_FORMAT,
+        "graph": dict(graph.graph),
+        "nodes": node_ids,
+        "node_columns": _columns([attrs for _, attrs in graph.nodes(data=True)]),
+        "sources": sources,
+        "targets": targets,
+        "edge_columns": _columns(edge_rows),
+    }
+
+
+def _unpack_columns(data: dict[str, Any]) -> nx.DiGraph:
+    if data.get("format") != _BINARY_FORMAT:
+        raise ValueError(f"Unsupported graph format: {data.get('format')!r}")
+    node_ids = data["nodes"]
+    sources = data["sources"]
+    graph = nx.DiGraph()
+    graph.graph.update(data["graph"])
+    graph.add_nodes_from(zip(node_ids, _rows(len(node_ids), data["node_columns"])))
+    graph.add_edges_from(
+        zip(
+            (node_ids[i] for i in sources),
+            (node_ids[i] for i in data["targets"]),
+            _rows(len(sources), data["edge_columns"]),
+        )
+    )
+    return graph
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=1)
 def load_python_language():
-    """Return a Tree-sitter Language object for Python."""
+    """Return the (process-wide, cached) Tree-sitter Language object for Python."""
     from tree_sitter import Language
 
     try:
@@ -3,21 +3,62 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import os
-from dataclasses import dataclass
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Iterable
 
 import networkx as nx
 
-from .llm_utils import extract_content, parse_json_content, repair_json_content
+from . import json_utils
+from .llm_utils import extract_content, parse_json_content, repair_json_content, text_part
 from .mcp_graph import GraphService
 from .openrouter_client import OpenRouterConfig, OpenRouterRequestError, chat_completions
 
 
-@dataclass(frozen=True)
+MAX_CONCURRENT_SUMMARIES = 8
+
+SYSTEM_PROMPT = (
+    "You are a product architect translating code into business workflows. "
+    "Output valid JSON only, with business-friendly labels."
+)
+
+WORKFLOW_OUTPUT_SCHEMA = {
+    "title": "string",
+    "summary": "string",
+    "steps": ["string"],
+    "decision_points": ["string"],
+    "inputs": ["string"],
+    "outputs": ["string"],
+    "risks": ["string"],
+    "confidence": "low|medium|high",
+    "mermaid": "string",
+    "supporting_nodes": [
+        {"id": "string", "label": "string", "type": "string", "path": "string"}
+    ],
+    "seed": {"node_id": "string", "label": "string"},
+}
+
+WORKFLOW_INSTRUCTIONS = (
+    "Return a JSON object matching output_schema. "
+    "Use business-friendly language, avoid raw code names in steps. "
+    "Mermaid should be a flowchart with 5-12 nodes. "
+    "If outline_only is true, keep steps concise."
+)
+
+# Shared by every seed, so it leads the user message where providers can
+# cache it; the seed-specific JSON follows in a second part.
+_WORKFLOW_PROMPT_PREFIX = json_utils.dumps(
+    {"output_schema": WORKFLOW_OUTPUT_SCHEMA, "instructions": WORKFLOW_INSTRUCTIONS}
+).decode("utf-8")
+
+
+@dataclass(frozen=True, slots=True)
 class WorkflowSeed:
     node_id: str
     label: str
@@ -26,7 +67,7 @@ class WorkflowSeed:
     path: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkflowMiningRequest:
     max_workflows: int = 8
     hops: int = 2
@@ -37,7 +78,7 @@ class WorkflowMiningRequest:
     include_graph_context: bool = True
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkflowArtifacts:
     generated_at: str
     source_graph: dict[str, Any]
@@ -51,27 +92,40 @@ def generate_workflow_artifacts(
     config: OpenRouterConfig,
 ) -> WorkflowArtifacts:
     seeds = select_workflow_seeds(service.graph, request.max_workflows)
-    workflows = []
-
-    for seed in seeds:
-        context = build_seed_context(
+    # Graph-wide summaries are the same for every seed; compute them once.
+    metadata = service.metadata()
+    stats = service.stats(limit=8)
+    contexts = [
+        build_seed_context(
             service,
             seed,
             hops=request.hops,
             edge_types=request.edge_types,
             max_nodes=request.max_nodes,
             max_edges=request.max_edges,
+            metadata=metadata,
+            stats=stats,
         )
-        workflow = summarize_workflow(context, request, config)
-        if workflow:
-            workflows.append(workflow)
+        for seed in seeds
+    ]
+
+    # Each summary is an independent, network-bound LLM call, so they run
+    # concurrently; map() keeps the results in seed order.
+    workflows = []
+    if contexts:
+        workers = min(MAX_CONCURRENT_SUMMARIES, len(contexts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda context: summarize_workflow(context, request, config), contexts
+            )
+            workflows = [workflow for workflow in results if workflow]
 
     generated_at = datetime.now(timezone.utc).isoformat()
     return WorkflowArtifacts(
         generated_at=generated_at,
-        source_graph=service.metadata(),
+        source_graph=metadata,
         workflows=workflows,
-        seeds=[seed.__dict__ for seed in seeds],
+        seeds=[asdict(seed) for seed in seeds],
     )
 
 
@@ -80,21 +134,17 @@ def summarize_workflow(
     request: WorkflowMiningRequest,
     config: OpenRouterConfig,
 ) -> dict[str, Any] | None:
-    system_prompt = (
-        "You are a product architect translating code into business workflows. "
-        "Output valid JSON only, with business-friendly labels."
-    )
-    user_prompt = build_workflow_prompt(context, request)
+    messages = [
+        {"role": "system", "content": [text_part(SYSTEM_PROMPT, cacheable=True)]},
+        {"role": "user", "content": build_workflow_prompt(context, request)},
+    ]
 
     response = None
     error_message = None
     try:
         response = chat_completions(
             config,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=messages,
             response_format={"type": "json_object"},
         )
     except OpenRouterRequestError as exc:
@@ -103,10 +153,7 @@ def summarize_workflow(
             try:
                 response = chat_completions(
                     config,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
+                    messages=messages,
                     response_format=None,
                 )
                 error_message = None
@@ -149,7 +196,10 @@ def build_seed_context(
     edge_types: list[str] | None,
     max_nodes: int,
     max_edges: int,
+    metadata: dict[str, Any] | None = None,
+    stats: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
+    """Context for one seed; pass ``metadata``/``stats`` to share them across seeds."""
     subgraph = service.subgraph(
         seed.node_id,
         hops=hops,
@@ -161,15 +211,18 @@ def build_seed_context(
     edges = subgraph.get("edges", [])[:max_edges]
 
     return {
-        "seed": seed.__dict__,
-        "metadata": service.metadata(),
-        "stats": service.stats(limit=8),
+        "seed": asdict(seed),
+        "metadata": service.metadata() if metadata is None else metadata,
+        "stats": service.stats(limit=8) if stats is None else stats,
         "supporting_nodes": nodes,
         "supporting_edges": edges,
     }
 
 
-def build_workflow_prompt(context: dict[str, Any], request: WorkflowMiningRequest) -> str:
+def build_workflow_prompt(
+    context: dict[str, Any], request: WorkflowMiningRequest
+) -> list[dict[str, Any]]:
+    """User message parts: the shared schema/instructions, then this seed."""
     prompt = {
         "seed": context.get("seed"),
         "metadata": context.get("metadata"),
@@ -177,39 +230,24 @@ def build_workflow_prompt(context: dict[str, Any], request: WorkflowMiningReques
         "supporting_nodes": context.get("supporting_nodes"),
         "supporting_edges": context.get("supporting_edges"),
         "outline_only": request.outline_only,
-        "output_schema": {
-            "title": "string",
-            "summary": "string",
-            "steps": ["string"],
-            "decision_points": ["string"],
-            "inputs": ["string"],
-            "outputs": ["string"],
-            "risks": ["string"],
-            "confidence": "low|medium|high",
-            "mermaid": "string",
-            "supporting_nodes": [
-                {"id": "string", "label": "string", "type": "string", "path": "string"}
-            ],
-            "seed": {"node_id": "string", "label": "string"},
-        },
-        "instructions": (
-            "Return a JSON object matching output_schema. "
-            "Use business-friendly language, avoid raw code names in steps. "
-            "Mermaid should be a flowchart with 5-12 nodes. "
-            "If outline_only is true, keep steps concise."
-        ),
     }
-    return json.dumps(prompt, indent=2)
+    return [
+        text_part(_WORKFLOW_PROMPT_PREFIX, cacheable=True),
+        text_part(json_utils.dumps(prompt).decode("utf-8")),
+    ]
+
+
+# Substrings of a lowercased file path that mark a likely entrypoint.
+_ENTRYPOINT_RE = re.compile(r"__main__|cli|pipeline|main\.py")
 
 
 def select_workflow_seeds(graph: nx.DiGraph, max_seeds: int) -> list[WorkflowSeed]:
     seeds: list[WorkflowSeed] = []
     added = set()
 
-    def add_seed(node_id: str, reason: str) -> None:
+    def add_seed(node_id: str, data: dict[str, Any], reason: str) -> None:
         if node_id in added:
             return
-        data = graph.nodes[node_id]
         label = _node_label(node_id, data)
         seeds.append(
             WorkflowSeed(
@@ -227,23 +265,24 @@ def select_workflow_seeds(graph: nx.DiGraph, max_seeds: int) -> list[WorkflowSee
         if data.get("type") != "File":
             continue
         path = str(data.get("path") or "").lower()
-        if any(token in path for token in ["__main__", "cli", "pipeline", "main.py"]):
-            add_seed(node_id, "entrypoint")
+        if _ENTRYPOINT_RE.search(path):
+            add_seed(node_id, data, "entrypoint")
             if len(seeds) >= max_seeds:
                 return seeds
 
-    # High-degree functions/classes as workflow hubs.
+    # High-degree functions/classes as workflow hubs. Entrypoints are File
+    # nodes, so none of these candidates is already a seed and a partial
+    # top-k (stable on ties, like sorted) picks exactly the remaining slots.
     degree = graph.degree()
-    ranked = sorted(degree, key=lambda item: item[1], reverse=True)
-    for node_id, _ in ranked:
-        data = graph.nodes[node_id]
-        if data.get("type") not in {"Function", "Class"}:
-            continue
-        if data.get("external"):
-            continue
-        add_seed(node_id, "hub")
-        if len(seeds) >= max_seeds:
-            break
+    candidates = (
+        (node_id, data, degree[node_id])
+        for node_id, data in graph.nodes(data=True)
+        if data.get("type") in {"Function", "Class"} and not data.get("external")
+    )
+    for node_id, data, _ in heapq.nlargest(
+        max_seeds - len(seeds), candidates, key=lambda item: item[2]
+    ):
+        add_seed(node_id, data, "hub")
 
     return seeds
 
@@ -273,35 +312,18 @@ def resolve_openrouter_config() -> OpenRouterConfig:
     )
 
 
-def _extract_api_key(raw: str) -> str:
-    text = raw.strip()
-    if not text:
-        return ""
-
-    for line in text.splitlines():
-        cleaned = line.strip()
-        if cleaned:
-            text = cleaned
-            break
-
-    if text.lower().startswith("export "):
-        text = text[len("export ") :].strip()
-
-    lowered = text.lower()
-    if lowered.startswith("openrouter_api_key"):
-        if "=" in text:
-            _, value = text.split("=", 1)
-            text = value.strip()
-        elif ":" in text:
-            _, value = text.split(":", 1)
-            text = value.strip()
-
-    if (text.startswith('"') and text.endswith('"')) or (
-        text.startswith("'") and text.endswith("'")
-    ):
-        text = text[1:-1].strip()
+# First non-blank line of a key file: an optional ``export`` and
+# ``OPENROUTER_API_KEY=``/``:`` prefix, then the key, optionally quoted.
+_API_KEY_RE = re.compile(
+    r"\A\s*(?:export[^\S\n]+)?(?:openrouter_api_key[^\S\n]*[:=][^\S\n]*)?"
+    r"(?P<quote>[\"']?)[^\S\n]*(?P<key>.*?)[^\S\n]*(?P=quote)[^\S\n]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
 
-    return text
+
+def _extract_api_key(raw: str) -> str:
+    match = _API_KEY_RE.match(raw)
+    return match.group("key") if match else ""
 
 
 def write_workflow_artifacts(artifacts: WorkflowArtifacts, output_path: str | Path) -> None:
@@ -311,7 +333,9 @@ def write_workflow_artifacts(artifacts: WorkflowArtifacts, output_path: str | Pa
         "seeds": artifacts.seeds,
         "workflows": artifacts.workflows,
     }
-    Path(output_path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # json.dump encodes incrementally, so the document is never built as one string.
+    with Path(output_path).open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
 
 
 def parse_args() -> argparse.Namespace:
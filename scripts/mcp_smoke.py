@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import argparse
 import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
 
 import anyio
 from mcp.client.session import ClientSession
@@ -15,18 +18,23 @@ def parse_args() -> argparse.Namespace:
         default="jwst_graph.json",
         help="Path to graph JSON",
     )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Serve from this process over memory streams instead of a stdio subprocess",
+    )
     return parser.parse_args()
 
 
-async def run() -> None:
-    args = parse_args()
+@asynccontextmanager
+async def _stdio_session(graph: str) -> AsyncIterator[ClientSession]:
     params = StdioServerParameters(
         command=sys.executable,
         args=[
             "-m",
             "codeintel.mcp_server",
             "--graph",
-            args.graph,
+            graph,
             "--transport",
             "stdio",
         ],
@@ -35,8 +43,33 @@ async def run() -> None:
     async with stdio_client(params) as (read_stream, write_stream):
         async with ClientSession(read_stream, write_stream) as session:
             await session.initialize()
-            tools = await session.list_tools()
-            meta = await session.call_tool("metadata")
+            yield session
+
+
+@asynccontextmanager
+async def _in_process_session(graph: str) -> AsyncIterator[ClientSession]:
+    # Builds the same server the CLI runs and connects to it over in-memory
+    # streams, skipping the interpreter start-up and the JSON-RPC pipes.
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    from codeintel.mcp_graph import GraphService, ensure_snapshot
+    from codeintel.mcp_server import create_server
+
+    graph_path = Path(graph)
+    if not graph_path.exists():
+        raise SystemExit(f"Graph not found: {graph_path}")
+    service = GraphService.from_json(graph_path)
+    ensure_snapshot(service.graph, source_root=str(graph_path))
+    async with create_connected_server_and_client_session(create_server(service)) as session:
+        yield session
+
+
+async def run() -> None:
+    args = parse_args()
+    open_session = _in_process_session if args.in_process else _stdio_session
+    async with open_session(args.graph) as session:
+        tools = await session.list_tools()
+        meta = await session.call_tool("metadata")
 
     payload = meta.structuredContent
     if payload is None and meta.content:
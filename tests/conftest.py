@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from functools import cache
+from pathlib import Path
+from typing import Callable, Iterator
+
+import httpx
+import networkx as nx
+import pytest
+from fastapi.testclient import TestClient
+
+from codeintel.extract import extract_symbols
+from codeintel.graph import build_graph
+from codeintel.parser import ParsedSource, get_default_parser
+
+
+@pytest.fixture(autouse=True)
+def _isolated_llm_cache(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    # Keep OpenRouter response caching out of the real home directory.
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "llm-cache"))
+    monkeypatch.delenv("LLM_CACHE_DISABLE", raising=False)
+
+
+@pytest.fixture
+def mock_openrouter(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[Callable[[Callable[[httpx.Request], httpx.Response]], list[httpx.Request]]]:
+    """Route OpenRouter calls through an ``httpx.MockTransport`` handler.
+
+    Calling the fixture with a handler installs it and returns the list of
+    requests the handler has seen. Handlers build a fresh ``httpx.Response``
+    per call (responses bind to their request); share pre-encoded bodies
+    instead.
+    """
+    clients: list[httpx.Client] = []
+
+    def install(handler: Callable[[httpx.Request], httpx.Response]) -> list[httpx.Request]:
+        requests: list[httpx.Request] = []
+
+        def recording_handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.Client(transport=httpx.MockTransport(recording_handler))
+        clients.append(client)
+        monkeypatch.setattr("codeintel.openrouter_client._get_client", lambda config: client)
+        return requests
+
+    yield install
+    for client in clients:
+        client.close()
+
+
+@cache
+def _parse_sample(source: str, path: str = "sample.py") -> tuple[ParsedSource, dict]:
+    parsed = get_default_parser().parse_text(source)
+    return parsed, extract_symbols(parsed, path=path)
+
+
+@pytest.fixture(scope="session")
+def parse_sample() -> Callable[..., tuple[ParsedSource, dict]]:
+    """Parse and extract a ``SAMPLE`` source once per session.
+
+    Returns ``(parsed, symbols)``; both are shared between tests, so treat
+    them as read-only.
+    """
+    return _parse_sample
+
+
+@pytest.fixture(scope="session")
+def sample_graph() -> Callable[[str], nx.DiGraph]:
+    """Build the graph for a module's ``SAMPLE`` source once per session.
+
+    The returned graph is shared between tests; copy it before mutating.
+    """
+
+    @cache
+    def build(source: str) -> nx.DiGraph:
+        return build_graph([_parse_sample(source)[1]])
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def py_tree(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A small read-only source tree for the file walker tests."""
+    root = tmp_path_factory.mktemp("walker")
+    files = {
+        "a.py": "print('a')",
+        "b.txt": "nope",
+        "sub/c.py": "print('c')",
+        ".venv/lib/site.py": "print('site')",
+        "pkg/__pycache__/mod.py": "print('mod')",
+    }
+    for relative, text in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+@pytest.fixture(scope="session")
+def api_client() -> Iterator[TestClient]:
+    """One TestClient for the API tests; lifespan runs once per session."""
+    from codeintel.api import app
+
+    with TestClient(app) as client:
+        yield client
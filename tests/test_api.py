@@ -1,10 +1,13 @@
 import io
+import json
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 
-from codeintel.api import app
+from codeintel.extract import extract_symbols
 
 
 def _make_zip_bytes() -> bytes:
@@ -15,13 +18,14 @@ def _make_zip_bytes() -> bytes:
     return buffer.getvalue()
 
 
-def test_parse_endpoint() -> None:
-    client = TestClient(app)
-    zip_bytes = _make_zip_bytes()
+# Deterministic, so every test can post the same archive.
+_ZIP_BYTES = _make_zip_bytes()
 
-    response = client.post(
+
+def test_parse_endpoint(api_client) -> None:
+    response = api_client.post(
         "/parse?max_files=5",
-        files={"file": ("repo.zip", zip_bytes, "application/zip")},
+        files={"file": ("repo.zip", _ZIP_BYTES, "application/zip")},
     )
     assert response.status_code == 200
     data = response.json()
@@ -29,46 +33,113 @@ def test_parse_endpoint() -> None:
     assert "links" in data or "edges" in data
 
 
-def test_parse_rejects_non_zip() -> None:
-    client = TestClient(app)
-    response = client.post(
+def test_parse_endpoint_ndjson(api_client) -> None:
+    response = api_client.post(
+        "/parse?format=ndjson",
+        files={"file": ("repo.zip", _ZIP_BYTES, "application/zip")},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["type"] == "graph"
+    assert any(
+        record["type"] == "node" and record["attrs"].get("name") == "foo"
+        for record in records
+    )
+
+
+def test_parse_endpoint_ndjson_removes_temp_file(
+    api_client, monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    import tempfile
+
+    monkeypatch.setattr(
+        "codeintel.api.mkstemp", lambda suffix: tempfile.mkstemp(suffix=suffix, dir=tmp_path)
+    )
+    response = api_client.post(
+        "/parse?format=ndjson",
+        files={"file": ("repo.zip", _ZIP_BYTES, "application/zip")},
+    )
+    assert response.status_code == 200
+    assert response.text
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_endpoint_parallel_extract(api_client, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("codeintel.api.PARALLEL_EXTRACT_MIN_MEMBERS", 0)
+    response = api_client.post(
+        "/parse",
+        files={"file": ("repo.zip", _ZIP_BYTES, "application/zip")},
+    )
+    assert response.status_code == 200
+    names = {node.get("name") for node in response.json()["nodes"]}
+    assert "foo" in names
+
+
+def test_parse_reuses_extract_cache_across_requests(
+    api_client, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from codeintel import pipeline
+
+    # A one-thread pool stands in for the long-lived worker process, so its
+    # extraction cache is visible from the test.
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr("codeintel.api._get_process_pool", lambda: executor)
+    monkeypatch.setattr(pipeline, "_extract_cache", OrderedDict())
+    extracted: list[str] = []
+
+    def counting_extract(parsed, path=None):
+        extracted.append(path)
+        return extract_symbols(parsed, path=path)
+
+    monkeypatch.setattr(pipeline, "extract_symbols", counting_extract)
+    try:
+        for _ in range(2):
+            response = api_client.post(
+                "/parse",
+                files={"file": ("repo.zip", _ZIP_BYTES, "application/zip")},
+            )
+            assert response.status_code == 200
+    finally:
+        executor.shutdown()
+
+    assert len(extracted) == 1
+
+
+def test_parse_rejects_non_zip(api_client) -> None:
+    response = api_client.post(
         "/parse",
         files={"file": ("repo.txt", b"not zip", "text/plain")},
     )
     assert response.status_code == 400
 
 
-def test_parse_requires_input() -> None:
-    client = TestClient(app)
-    response = client.post("/parse")
+def test_parse_requires_input(api_client) -> None:
+    response = api_client.post("/parse")
     assert response.status_code == 400
 
 
-def test_parse_repo_url(monkeypatch: pytest.MonkeyPatch) -> None:
-    client = TestClient(app)
-    zip_bytes = _make_zip_bytes()
+_BRANCH_BYTES = b'{"default_branch": "main"}'
 
-    class FakeResponse:
-        def __init__(self, status_code: int, content: bytes, json_payload: dict | None = None) -> None:
-            self.status_code = status_code
-            self.content = content
-            self._json_payload = json_payload
 
-        def json(self) -> dict:
-            if self._json_payload is None:
-                raise ValueError("No JSON payload")
-            return self._json_payload
+def _github_handler(request: httpx.Request) -> httpx.Response:
+    # httpx.Response objects bind to one request, so only the bodies are shared.
+    if request.url.host == "api.github.com":
+        return httpx.Response(
+            200, content=_BRANCH_BYTES, headers={"Content-Type": "application/json"}
+        )
+    return httpx.Response(200, content=_ZIP_BYTES)
 
-    def fake_get(url: str, timeout: float = 60.0, **_kwargs) -> FakeResponse:
-        if url.startswith("https://api.github.com/repos/"):
-            return FakeResponse(200, b"", {"default_branch": "main"})
-        return FakeResponse(200, zip_bytes)
 
-    monkeypatch.setattr("codeintel.api.httpx.get", fake_get)
-
-    response = client.post(
-        "/parse?repo_url=https://github.com/spacetelescope/jwst&max_files=5"
-    )
+def test_parse_repo_url(api_client, monkeypatch: pytest.MonkeyPatch) -> None:
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(_github_handler))
+    monkeypatch.setattr(api_client.app.state, "http_client", http_client)
+    try:
+        response = api_client.post(
+            "/parse?repo_url=https://github.com/spacetelescope/jwst&max_files=5"
+        )
+    finally:
+        api_client.portal.call(http_client.aclose)
     assert response.status_code == 200
     data = response.json()
     assert "nodes" in data
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from codeintel.extract import extract_symbols
-from codeintel.parser import PythonParser
+from codeintel.parser import get_default_parser
 
 
 SAMPLE = """
@@ -33,10 +33,8 @@ class Bar(Foo):
 """
 
 
-def test_extracts_functions_classes_variables_calls_imports():
-    parser = PythonParser()
-    parsed = parser.parse_text(SAMPLE)
-    symbols = extract_symbols(parsed)
+def test_extracts_functions_classes_variables_calls_imports(parse_sample):
+    _, symbols = parse_sample(SAMPLE)
 
     func_names = {sym.qualname for sym in symbols["functions"]}
     class_names = {sym.qualname for sym in symbols["classes"]}
@@ -69,3 +67,15 @@ def test_extracts_functions_classes_variables_calls_imports():
     inherits = symbols["inherits"]
     inherit_pairs = {(item.class_name, item.bases) for item in inherits}
     assert ("Bar", ("Foo",)) in inherit_pairs
+
+
+def test_parse_file_matches_parse_text(tmp_path, parse_sample):
+    source = tmp_path / "sample.py"
+    source.write_text(SAMPLE, encoding="utf-8")
+    empty = tmp_path / "empty.py"
+    empty.write_bytes(b"")
+    parser = get_default_parser()
+
+    _, expected = parse_sample(SAMPLE)
+    assert extract_symbols(parser.parse_file(str(source)), path="sample.py") == expected
+    assert extract_symbols(parser.parse_file(str(empty)))["functions"] == []
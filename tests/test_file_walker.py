@@ -1,21 +1,18 @@
 from __future__ import annotations
 
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
 from codeintel.file_walker import iter_python_files
 
 
-def test_iter_python_files_filters_non_py():
-    with TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-        (root / "a.py").write_text("print('a')", encoding="utf-8")
-        (root / "b.txt").write_text("nope", encoding="utf-8")
-        sub = root / "sub"
-        sub.mkdir()
-        (sub / "c.py").write_text("print('c')", encoding="utf-8")
+def test_iter_python_files_filters_non_py(py_tree: Path):
+    names = {Path(path).name for path in iter_python_files(py_tree)}
 
-        matches = iter_python_files(root)
-        names = {Path(path).name for path in matches}
+    assert "b.txt" not in names
+    assert {"a.py", "c.py"} <= names
 
-        assert names == {"a.py", "c.py"}
\ No newline at end of file
+
+def test_iter_python_files_skips_excluded_dirs(py_tree: Path):
+    names = {Path(path).name for path in iter_python_files(py_tree)}
+
+    assert names == {"a.py", "c.py"}
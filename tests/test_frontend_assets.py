@@ -3,6 +3,17 @@ from __future__ import annotations
 from pathlib import Path
 
 
+INDEX_MARKERS = (
+    "cytoscape",
+    "JWST Knowledge Graph",
+    "moduleFilter",
+    "classFilter",
+    "clusterSelect",
+    "workflowTab",
+    "workflowPath",
+)
+
+
 def test_frontend_assets_exist():
     root = Path(__file__).resolve().parents[1]
     frontend = root / "frontend"
@@ -15,10 +26,5 @@ def test_frontend_assets_exist():
     assert app_file.exists()
 
     content = index_file.read_text(encoding="utf-8")
-    assert "cytoscape" in content
-    assert "JWST Knowledge Graph" in content
-    assert "moduleFilter" in content
-    assert "classFilter" in content
-    assert "clusterSelect" in content
-    assert "workflowTab" in content
-    assert "workflowPath" in content
+    missing = [marker for marker in INDEX_MARKERS if marker not in content]
+    assert missing == []
@@ -3,18 +3,21 @@ from __future__ import annotations
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import pytest
+
 from codeintel.extract import extract_symbols
 from codeintel.graph import (
     EDGE_CALLS,
     EDGE_IMPORTS,
     EDGE_INHERITS,
+    build_compact_graph,
     build_graph,
     class_node_id,
     file_node_id,
     function_node_id,
     module_node_id,
 )
-from codeintel.parser import PythonParser
+from codeintel.parser import get_default_parser
 from codeintel.storage import load_graph, save_graph
 
 
@@ -40,15 +43,12 @@ def bar():
 """
 
 
-def _build_graph():
-    parser = PythonParser()
-    parsed = parser.parse_text(SAMPLE)
-    symbols = extract_symbols(parsed, path="sample.py")
-    return build_graph([symbols])
+@pytest.fixture
+def graph(sample_graph):
+    return sample_graph(SAMPLE)
 
 
-def test_build_graph_nodes_and_edges():
-    graph = _build_graph()
+def test_build_graph_nodes_and_edges(graph):
     file_id = file_node_id("sample.py")
 
     assert file_id in graph.nodes
@@ -85,12 +85,68 @@ def test_build_graph_nodes_and_edges():
     )
 
 
-def test_graph_serialization_roundtrip():
-    graph = _build_graph()
+def test_compact_graph_matches_networkx_view(parse_sample):
+    _, symbols = parse_sample(SAMPLE)
+    compact = build_compact_graph([symbols])
+    graph = compact.to_networkx()
+
+    assert compact.number_of_nodes() == graph.number_of_nodes()
+    assert compact.number_of_edges() == graph.number_of_edges()
+    assert graph.nodes[file_node_id("sample.py")]["type"] == "File"
+    assert module_node_id("os") in compact
+
+
+def test_graph_serialization_roundtrip(graph):
     with TemporaryDirectory() as tmpdir:
         path = Path(tmpdir) / "graph.json"
         save_graph(graph, path)
         loaded = load_graph(path)
 
     assert loaded.number_of_nodes() == graph.number_of_nodes()
-    assert loaded.number_of_edges() == graph.number_of_edges()
\ No newline at end of file
+    assert loaded.number_of_edges() == graph.number_of_edges()
+
+
+def test_graph_serialization_roundtrip_gzip(graph):
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "graph.json.gz"
+        save_graph(graph, path)
+        assert path.read_bytes()[:2] == b"\x1f\x8b"
+        loaded = load_graph(path)
+
+    assert list(loaded.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(loaded.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_graph_serialization_roundtrip_binary(graph):
+    graph = graph.copy()
+    graph.nodes[file_node_id("sample.py")]["lines"] = 12
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "graph.pkl"
+        save_graph(graph, path)
+        loaded = load_graph(path)
+
+    assert list(loaded.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(loaded.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_self_call_resolves_to_inherited_method():
+    parser = get_default_parser()
+    base = extract_symbols(
+        parser.parse_text("class Base:\n    def helper(self):\n        return 1\n"),
+        path="base.py",
+    )
+    sub = extract_symbols(
+        parser.parse_text(
+            "from base import Base\n\n"
+            "class Sub(Base):\n"
+            "    def run(self):\n"
+            "        return self.helper()\n"
+        ),
+        path="sub.py",
+    )
+    graph = build_graph([base, sub])
+
+    assert graph.has_edge(
+        function_node_id("sub.py", "Sub.run"),
+        function_node_id("base.py", "Base.helper"),
+    )
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from codeintel.llm_utils import _extract_json_candidate, parse_json_content
+
+
+def test_extract_json_candidate_ignores_trailing_prose_braces():
+    content = 'Here you go: {"a": {"b": "}"}, "c": "\\"{"} and a stray } here.'
+    assert _extract_json_candidate(content) == '{"a": {"b": "}"}, "c": "\\"{"}'
+
+
+def test_extract_json_candidate_unbalanced_returns_none():
+    assert _extract_json_candidate('{"a": 1') is None
+    assert _extract_json_candidate("no json") is None
+
+
+def test_parse_json_content_recovers_fenced_output():
+    data, error = parse_json_content('```json\n{"title": "Plan"}\n```\nThanks {:}')
+    assert error is None
+    assert data == {"title": "Plan"}
+
+
+def test_parse_json_content_skips_prose_braces_before_object():
+    data, error = parse_json_content('Fill in {name} below:\n{"title": "Plan"}')
+    assert error is None
+    assert data == {"title": "Plan"}
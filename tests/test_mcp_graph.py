@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from codeintel.extract import extract_symbols
-from codeintel.graph import build_graph
+import pytest
+
 from codeintel.mcp_graph import GraphService
-from codeintel.parser import PythonParser
 
 
 SAMPLE = """
@@ -27,46 +26,100 @@ def bar():
 """
 
 
-def _service() -> GraphService:
-    parser = PythonParser()
-    parsed = parser.parse_text(SAMPLE)
-    symbols = extract_symbols(parsed, path="sample.py")
-    graph = build_graph([symbols])
-    return GraphService(graph)
+@pytest.fixture(scope="module")
+def service(sample_graph) -> GraphService:
+    # GraphService only answers queries, so one instance serves the module.
+    return GraphService(sample_graph(SAMPLE))
 
 
-def test_search():
-    service = _service()
+def test_search(service):
     result = service.search("Foo.method")
     assert result["matches"]
     assert any(match["qualname"] == "Foo.method" for match in result["matches"])
 
 
-def test_get_dependencies():
-    service = _service()
-    result = service.get_dependencies("Foo.method", direction="outgoing", hops=1)
+@pytest.mark.parametrize(
+    ("query", "kwargs", "expected"),
+    [
+        ("get_dependencies", {"direction": "outgoing"}, ("Foo.method", "Foo.helper")),
+        ("impact_analysis", {}, ("Foo.helper", "Foo.method")),
+    ],
+)
+def test_one_hop_neighbours(service, query, kwargs, expected):
+    start, neighbour = expected
+    result = getattr(service, query)(start, hops=1, **kwargs)
     node_names = {node.get("qualname") for node in result["nodes"]}
-    assert "Foo.helper" in node_names
-
+    assert neighbour in node_names
 
-def test_impact_analysis():
-    service = _service()
-    result = service.impact_analysis("Foo.helper", hops=1)
-    node_names = {node.get("qualname") for node in result["nodes"]}
-    assert "Foo.method" in node_names
 
-
-def test_graph_path():
-    service = _service()
+def test_graph_path(service):
     result = service.graph_path("Foo.method", "Foo.helper")
     path = [node.get("qualname") for node in result["path"]]
     assert path[0] == "Foo.method"
     assert path[-1] == "Foo.helper"
 
 
-def test_stats_metadata():
-    service = _service()
+def test_stats_metadata(service):
     stats = service.stats()
     assert "Function" in stats["node_counts"]
     metadata = service.metadata()
     assert metadata["node_count"] > 0
+    metadata["node_count"] = -1
+    assert service.metadata()["node_count"] > 0
+
+
+def test_stats_hubs_respect_edge_types(service):
+    calls = service.stats(edge_types=["CALLS"], limit=100)
+    degrees = {hub["id"]: hub["degree"] for hub in calls["top_hubs"]}
+    assert degrees["func:sample.py:Foo.method"] == 2
+    assert degrees["class:sample.py:Bar"] == 0
+    assert service.stats(limit=100)["top_hubs"][0]["degree"] == 2
+
+
+def test_search_substring_matches_short_and_long_queries(service):
+    long_query = {match["id"] for match in service.search("OO.MET")["matches"]}
+    assert "func:sample.py:Foo.method" in long_query
+    short_query = {match["id"] for match in service.search("ba", limit=100)["matches"]}
+    assert {"func:sample.py:bar", "class:sample.py:Bar"} <= short_query
+    assert service.search("method.helper")["matches"] == []
+
+
+def test_graph_path_reports_stored_edge_direction(service):
+    result = service.graph_path("Foo.helper", "Foo.method")
+    assert [node["qualname"] for node in result["path"]] == ["Foo.helper", "Foo.method"]
+    assert result["edges"] == [
+        {
+            "source": "func:sample.py:Foo.method",
+            "target": "func:sample.py:Foo.helper",
+            "type": "CALLS",
+        }
+    ]
+
+
+def test_bfs_stops_at_limit(service):
+    result = service.get_dependencies("sample.py", hops=3, limit=2)
+    assert len(result["nodes"]) == 2
+    node_ids = {node["id"] for node in result["nodes"]}
+    assert all(
+        edge["source"] in node_ids or edge["target"] in node_ids
+        for edge in result["edges"]
+    )
+
+
+def test_search_filters_by_node_type(service):
+    for query in ("fo", "foo"):
+        matches = service.search(query, node_types=["Class"])["matches"]
+        assert [match["id"] for match in matches] == ["class:sample.py:Foo"]
+
+
+def test_graph_path_same_source_and_target(service):
+    result = service.graph_path("Foo.method", "Foo.method", directed=True)
+    assert [node["qualname"] for node in result["path"]] == ["Foo.method"]
+    assert result["edges"] == []
+    assert "error" not in result
+
+
+def test_multi_subgraph_matches_individual_subgraphs(service):
+    queries = ["Foo", "bar", "Foo.method", "missing"]
+    combined = service.multi_subgraph(queries, hops=2, limit=3)
+    assert combined == [service.subgraph(query, hops=2, limit=3) for query in queries]
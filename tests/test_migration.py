@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-from typing import Any
+import json
 
+import httpx
 import pytest
 
-from codeintel.extract import extract_symbols
-from codeintel.graph import build_graph
 from codeintel.mcp_graph import GraphService
-from codeintel.migration import MigrationPlanRequest, generate_migration_plan
+from codeintel.migration import MigrationPlanRequest, _plan_outputs, generate_migration_plan
 from codeintel.openrouter_client import OpenRouterConfig
-from codeintel.parser import PythonParser
 
 
 SAMPLE = """
@@ -23,29 +21,13 @@ def bar():
 """
 
 
-def _service() -> GraphService:
-    parser = PythonParser()
-    parsed = parser.parse_text(SAMPLE)
-    symbols = extract_symbols(parsed, path="sample.py")
-    graph = build_graph([symbols])
-    return GraphService(graph)
+@pytest.fixture
+def service(sample_graph) -> GraphService:
+    return GraphService(sample_graph(SAMPLE))
 
 
-class DummyResponse:
-    def __init__(self, payload: dict[str, Any]):
-        self._payload = payload
-
-    def raise_for_status(self) -> None:
-        return None
-
-    def json(self) -> dict[str, Any]:
-        return self._payload
-
-
-def test_generate_migration_plan(monkeypatch: pytest.MonkeyPatch):
-    service = _service()
-
-    payload = {
+_PLAN_RESPONSE = json.dumps(
+    {
         "choices": [
             {
                 "message": {
@@ -69,11 +51,18 @@ def test_generate_migration_plan(monkeypatch: pytest.MonkeyPatch):
         ],
         "usage": {"prompt_tokens": 10, "completion_tokens": 20},
     }
+).encode("utf-8")
+_UNSUPPORTED_FORMAT_RESPONSE = b'{"error": "response_format not supported"}'
+
+
+def _plan_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200, content=_PLAN_RESPONSE, headers={"Content-Type": "application/json"}
+    )
 
-    def fake_post(*args, **kwargs):
-        return DummyResponse(payload)
 
-    monkeypatch.setattr("codeintel.openrouter_client.httpx.post", fake_post)
+def test_generate_migration_plan(service, mock_openrouter):
+    mock_openrouter(_plan_response)
 
     request = MigrationPlanRequest(
         goal="Migrate to new stack",
@@ -90,45 +79,13 @@ def test_generate_migration_plan(monkeypatch: pytest.MonkeyPatch):
     assert result.error is None
 
 
-def test_generate_migration_plan_fallback_on_400(monkeypatch: pytest.MonkeyPatch):
-    service = _service()
-
-    error_payload = {"error": "response_format not supported"}
-    success_payload = {
-        "choices": [
-            {
-                "message": {
-                    "content": (
-                        "{\n"
-                        "  \"title\": \"Migration Plan\",\n"
-                        "  \"summary\": \"Move\",\n"
-                        "  \"assumptions\": [],\n"
-                        "  \"scope\": \"\",\n"
-                        "  \"phases\": [],\n"
-                        "  \"risks\": [],\n"
-                        "  \"validation\": [],\n"
-                        "  \"checklist\": [],\n"
-                        "  \"mermaid\": [],\n"
-                        "  \"cursor_prompt\": \"Create MIGRATION_PLAN.md\",\n"
-                        "  \"plan_markdown\": \"# Plan\"\n"
-                        "}\n"
-                    )
-                }
-            }
-        ]
-    }
-
-    call_count = {"count": 0}
-
-    def fake_post(*args, **kwargs):
-        call_count["count"] += 1
-        if call_count["count"] == 1:
-            request = __import__("httpx").Request("POST", "https://openrouter.ai/api/v1/chat/completions")
-            return __import__("httpx").Response(400, json=error_payload, request=request)
-        request = __import__("httpx").Request("POST", "https://openrouter.ai/api/v1/chat/completions")
-        return __import__("httpx").Response(200, json=success_payload, request=request)
+def test_generate_migration_plan_fallback_on_400(service, mock_openrouter):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(requests) == 1:
+            return httpx.Response(400, content=_UNSUPPORTED_FORMAT_RESPONSE)
+        return _plan_response(request)
 
-    monkeypatch.setattr("codeintel.openrouter_client.httpx.post", fake_post)
+    requests = mock_openrouter(handler)
 
     request = MigrationPlanRequest(goal="Migrate", outline_only=True)
     config = OpenRouterConfig(api_key="test", model="test-model")
@@ -136,3 +93,12 @@ def test_generate_migration_plan_fallback_on_400(monkeypatch: pytest.MonkeyPatch
     result = generate_migration_plan(service, request, config)
     assert result.plan
     assert result.error is None
+    assert len(requests) == 2
+
+
+def test_plan_outputs_joins_markdown_lines():
+    assert _plan_outputs({"cursor_prompt": "go", "plan_markdown_lines": ["# Plan", "- a"]}) == (
+        "go",
+        "# Plan\n- a",
+    )
+    assert _plan_outputs({"plan_markdown": "", "plan_markdown_lines": ["x"]}) == (None, "")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from codeintel.openrouter_client import (
+    OpenRouterConfig,
+    OpenRouterRequestError,
+    chat_completions,
+    chat_completions_async,
+)
+
+
+_COMPLETION = b'{"choices": [{"message": {"content": "{}"}}]}'
+
+
+def _completion_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200, content=_COMPLETION, headers={"Content-Type": "application/json"}
+    )
+
+
+def test_chat_completions_reuses_cached_response(mock_openrouter):
+    requests = mock_openrouter(_completion_response)
+    config = OpenRouterConfig(api_key="test", model="test-model")
+    messages = [{"role": "user", "content": "hello"}]
+
+    first = chat_completions(config, messages)
+    second = chat_completions(config, messages)
+    assert first == second
+    assert len(requests) == 1
+
+    chat_completions(config, messages, response_format={"type": "json_object"})
+    assert len(requests) == 2
+
+
+def test_chat_completions_cache_can_be_disabled(
+    mock_openrouter, monkeypatch: pytest.MonkeyPatch
+):
+    requests = mock_openrouter(_completion_response)
+    monkeypatch.setenv("LLM_CACHE_DISABLE", "1")
+    config = OpenRouterConfig(api_key="test", model="test-model")
+    messages = [{"role": "user", "content": "hello"}]
+
+    chat_completions(config, messages)
+    chat_completions(config, messages)
+    assert len(requests) == 2
+
+
+def test_chat_completions_caches_only_usable_completions(mock_openrouter):
+    requests = mock_openrouter(
+        lambda request: httpx.Response(200, json={"error": {"message": "upstream timeout"}})
+    )
+    config = OpenRouterConfig(api_key="test", model="test-model")
+    messages = [{"role": "user", "content": "hello"}]
+
+    chat_completions(config, messages)
+    chat_completions(config, messages)
+    assert len(requests) == 2
+
+
+def test_chat_completions_cache_is_off_without_cache_dir(
+    mock_openrouter, monkeypatch: pytest.MonkeyPatch
+):
+    requests = mock_openrouter(_completion_response)
+    monkeypatch.delenv("LLM_CACHE_DIR")
+    config = OpenRouterConfig(api_key="test", model="test-model")
+    messages = [{"role": "user", "content": "hello"}]
+
+    chat_completions(config, messages)
+    chat_completions(config, messages)
+    assert len(requests) == 2
+
+
+def test_chat_completions_async_uses_given_client():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if b"fail" in request.content:
+            return httpx.Response(400, json={"error": "bad"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})
+
+    config = OpenRouterConfig(api_key="test", model="test-model")
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            messages = [{"role": "user", "content": "hello"}]
+            result = await chat_completions_async(config, messages, client=client)
+            assert result["choices"][0]["message"]["content"] == "{}"
+            assert await chat_completions_async(config, messages, client=client) == result
+            with pytest.raises(OpenRouterRequestError) as excinfo:
+                await chat_completions_async(
+                    config, [{"role": "user", "content": "fail"}], client=client
+                )
+            assert excinfo.value.payload == {"error": "bad"}
+
+    asyncio.run(run())
+    assert len(requests) == 2
+
+
+def test_chat_completions_joins_identical_inflight_request(
+    mock_openrouter, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("LLM_CACHE_DISABLE", "1")
+    entered = threading.Event()
+    release = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        entered.set()
+        release.wait(timeout=5)
+        return _completion_response(request)
+
+    requests = mock_openrouter(handler)
+    config = OpenRouterConfig(api_key="test", model="test-model")
+    messages = [{"role": "user", "content": "hello"}]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(chat_completions, config, messages)
+        assert entered.wait(timeout=5)
+        second = executor.submit(chat_completions, config, messages)
+        time.sleep(0.1)
+        release.set()
+        assert first.result() == second.result()
+
+    assert len(requests) == 1
+    chat_completions(config, messages)
+    assert len(requests) == 2
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from codeintel.pipeline import build_graph_from_root, resolve_root
+import pytest
+
+from codeintel import pipeline
+from codeintel.pipeline import (
+    _parse_and_extract,
+    build_graph_from_root,
+    extract_files,
+    resolve_root,
+)
 
 
 def test_resolve_root_prefers_existing_candidate():
@@ -53,3 +62,81 @@ def bar():
         assert snapshot.get("source_root") == str(root)
         assert snapshot.get("node_count") == graph.number_of_nodes()
         assert snapshot.get("edge_count") == graph.number_of_edges()
+
+
+def test_extract_files_parallel_matches_serial(monkeypatch: pytest.MonkeyPatch):
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        files = []
+        for idx in range(4):
+            path = root / f"mod{idx}.py"
+            path.write_text(f"def f{idx}():\n    return g{idx}()\n", encoding="utf-8")
+            files.append(str(path))
+
+        serial = extract_files(files, workers=1)
+        monkeypatch.setattr(pipeline, "PARALLEL_MIN_FILES", 0)
+        parallel = extract_files(files, workers=2)
+
+    assert parallel == serial
+
+
+def test_parse_and_extract_reuses_results_for_identical_content():
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        first = root / "a.py"
+        second = root / "b.py"
+        for path in (first, second):
+            path.write_text("def f():\n    return g()\n", encoding="utf-8")
+
+        extracted_first = _parse_and_extract(str(first))
+        extracted_second = _parse_and_extract(str(second))
+
+    assert extracted_first["path"] == str(first)
+    assert extracted_second["path"] == str(second)
+    assert extracted_second["functions"] == extracted_first["functions"]
+    assert extracted_second["calls"] == extracted_first["calls"]
+
+
+def test_parse_and_extract_results_do_not_share_cached_lists(monkeypatch: pytest.MonkeyPatch):
+    # Start empty so the first call takes the cache-miss path.
+    monkeypatch.setattr(pipeline, "_extract_cache", OrderedDict())
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "a.py"
+        path.write_text("def f():\n    return g()\n", encoding="utf-8")
+
+        first = _parse_and_extract(str(path))
+        expected_calls = list(first["calls"])
+        first["calls"].append("mutated")
+        first["path"] = "elsewhere.py"
+        second = _parse_and_extract(str(path))
+
+    assert second["calls"] == expected_calls
+    assert second["path"] == str(path)
+
+
+def test_default_parser_is_shared_per_thread():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from codeintel.parser import get_default_parser
+
+    parser = get_default_parser()
+    assert get_default_parser() is parser
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(get_default_parser).result() is not parser
+
+
+def test_parse_and_extract_closes_the_mapping(monkeypatch: pytest.MonkeyPatch):
+    read_source = pipeline.read_source
+    mappings = []
+
+    def recording_read_source(path):
+        mappings.append(read_source(path))
+        return mappings[-1]
+
+    monkeypatch.setattr(pipeline, "read_source", recording_read_source)
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "mod.py"
+        path.write_text("def f():\n    return 1\n", encoding="utf-8")
+        _parse_and_extract(str(path))
+
+    assert mappings[0].closed
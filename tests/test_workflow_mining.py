@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from typing import Any
+import json
 
+import httpx
 import pytest
 
-from codeintel.extract import extract_symbols
-from codeintel.graph import build_graph
 from codeintel.mcp_graph import GraphService
 from codeintel.openrouter_client import OpenRouterConfig
-from codeintel.parser import PythonParser
 from codeintel.workflow_mining import (
     WorkflowMiningRequest,
+    _extract_api_key,
+    build_seed_context,
+    build_workflow_prompt,
     generate_workflow_artifacts,
+    select_workflow_seeds,
 )
 
 
@@ -26,29 +28,13 @@ def bar():
 """
 
 
-def _service() -> GraphService:
-    parser = PythonParser()
-    parsed = parser.parse_text(SAMPLE)
-    symbols = extract_symbols(parsed, path="sample.py")
-    graph = build_graph([symbols])
-    return GraphService(graph)
+@pytest.fixture
+def service(sample_graph) -> GraphService:
+    return GraphService(sample_graph(SAMPLE))
 
 
-class DummyResponse:
-    def __init__(self, payload: dict[str, Any]):
-        self._payload = payload
-
-    def raise_for_status(self) -> None:
-        return None
-
-    def json(self) -> dict[str, Any]:
-        return self._payload
-
-
-def test_workflow_artifacts_generation(monkeypatch: pytest.MonkeyPatch):
-    service = _service()
-
-    payload = {
+_WORKFLOW_RESPONSE = json.dumps(
+    {
         "choices": [
             {
                 "message": {
@@ -70,15 +56,40 @@ def test_workflow_artifacts_generation(monkeypatch: pytest.MonkeyPatch):
             }
         ]
     }
+).encode("utf-8")
+
+
+def _workflow_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200, content=_WORKFLOW_RESPONSE, headers={"Content-Type": "application/json"}
+    )
 
-    def fake_post(*args, **kwargs):
-        return DummyResponse(payload)
 
-    monkeypatch.setattr("codeintel.openrouter_client.httpx.post", fake_post)
+def test_workflow_artifacts_generation(service, mock_openrouter):
+    mock_openrouter(_workflow_response)
 
     request = WorkflowMiningRequest(max_workflows=1, outline_only=True)
     config = OpenRouterConfig(api_key="test", model="test-model")
 
     artifacts = generate_workflow_artifacts(service, request, config)
     assert artifacts.workflows
-    assert artifacts.workflows[0]["title"] == "Workflow"
\ No newline at end of file
+    assert artifacts.workflows[0]["title"] == "Workflow"
+
+
+def test_workflow_prompt_puts_static_prefix_first(service):
+    seed = select_workflow_seeds(service.graph, 1)[0]
+    context = build_seed_context(
+        service, seed, hops=1, edge_types=None, max_nodes=10, max_edges=10
+    )
+    parts = build_workflow_prompt(context, WorkflowMiningRequest())
+    assert parts[0]["cache_control"] == {"type": "ephemeral"}
+    assert "output_schema" in parts[0]["text"]
+    assert "cache_control" not in parts[1]
+    assert seed.node_id in parts[1]["text"]
+
+
+def test_extract_api_key_accepts_common_key_file_formats():
+    assert _extract_api_key("sk-abc\n") == "sk-abc"
+    assert _extract_api_key("\n  export OPENROUTER_API_KEY='sk-abc'\nother") == "sk-abc"
+    assert _extract_api_key('OPENROUTER_API_KEY: "sk-abc"\r\n') == "sk-abc"
+    assert _extract_api_key("  \n") == ""